@@ -4,20 +4,38 @@ Claude Code Stop-hook quality gate.
 
 At "turn end" (Claude Code Stop hook):
 1) Ensure refs/remotes/origin/main exists (git fetch only if missing by default)
-2) Compute changed files vs origin/main using merge-base(origin/main, HEAD)
+2) Compute changed files vs origin/main using merge-base(origin/main, HEAD) (committed
+   via `git diff-tree --merge-base origin/main HEAD`, uncommitted via `git status`), limited by git
+   pathspecs to the Python/TypeScript, Rust and Markdown extensions below
 3) If changes exist:
    - If any Python/TypeScript files changed: run `make check-fmt lint typecheck` (only targets that exist)
    - If any Rust files changed:             run `make check-fmt lint`          (only targets that exist)
    - If any Markdown files changed:         run `make markdownlint`            (only targets that exist)
+   All requested targets run in one `make --keep-going --jobs=N` process, so every
+   target reports its diagnostics in one turn (a non-zero exit may therefore
+   accompany targets that passed). With POST_TURN_SPLIT_GROUPS=1 the code and
+   Markdown groups get a `make` each, run concurrently unless POST_TURN_SERIAL=1.
 4) If any invoked command fails, BLOCK the stop with a detailed reason.
 
 Behaviour knobs (env vars):
 - POST_TURN_ALWAYS_FETCH=1   -> always `git fetch origin main` (otherwise only if origin/main missing)
+- POST_TURN_FETCH_TTL=N      -> with ALWAYS_FETCH, skip the fetch when the hook last fetched less
+                                than N seconds ago (default: 300; 0 fetches every turn)
 - POST_TURN_BASE_REF=...     -> override base ref (default: origin/main)
 - POST_TURN_MAX_OUTPUT_CHARS -> truncate per-command output (default: 12000)
 - POST_TURN_COMPUSH=1        -> after successful checks, BLOCK if uncommitted/untracked changes
                                 remain, or if local commits are ahead of upstream,
                                 and remind the agent to commit and/or push
+- POST_TURN_GIT / POST_TURN_MAKE -> absolute paths to the git and make executables
+                                (default: looked up on PATH once per run)
+- POST_TURN_MAKE_JOBS=N       -> parallel jobs per make invocation (default: CPU count;
+                                0 runs targets one at a time)
+- POST_TURN_SPLIT_GROUPS=1    -> run the code and Markdown targets as separate make processes
+- POST_TURN_SERIAL=1          -> with SPLIT_GROUPS, run the two make processes one after the
+                                other, for linters that contend for a shared cache or lock
+- POST_TURN_SKIP_IF_NO_EDITS=1 -> exit without running git or make when the session
+                                transcript shows the turn used only read-only tools
+                                (never after a block, while the stop hook is active)
 
 Claude Code contract:
 - Reads JSON hook input from stdin (but works even if stdin isn't JSON)
@@ -33,20 +51,37 @@ Run the hook manually with a default environment:
 
 from __future__ import annotations
 
+import codecs
+import functools
+import itertools
 import json
 import os
-import re
 import shutil
 import subprocess
 import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 
 PY_TS_EXTS = {".py", ".pyi", ".ts", ".tsx", ".mts", ".cts"}
 RUST_EXTS = {".rs"}
 MD_EXTS = {".md", ".mdx", ".markdown"}
+# Case-insensitive pathspecs so git filters out paths no category cares about.
+CHANGE_PATHSPECS = tuple(
+    f":(icase)*{ext}" for ext in sorted(PY_TS_EXTS | RUST_EXTS | MD_EXTS)
+)
+
+# Lower-cased extension to category, so classification is one dict lookup.
+EXT_TO_CAT: dict[str, str] = {
+    **dict.fromkeys(PY_TS_EXTS, "python_ts"),
+    **dict.fromkeys(RUST_EXTS, "rust"),
+    **dict.fromkeys(MD_EXTS, "markdown"),
+}
 
 CATS_TO_TARGETS: dict[str, list[str]] = {
     "python_ts": ["check-fmt", "lint", "typecheck"],
@@ -55,7 +90,51 @@ CATS_TO_TARGETS: dict[str, list[str]] = {
 }
 CODE_CATS = {"python_ts", "rust"}
 MD_CATS = {"markdown"}
-TRUTHY_VALUES = {"1", "true", "yes"}
+# Variables that change how git discovers the repository from a directory.
+GIT_DISCOVERY_ENV_VARS = (
+    "GIT_DIR",
+    "GIT_WORK_TREE",
+    "GIT_COMMON_DIR",
+    "GIT_CEILING_DIRECTORIES",
+    "GIT_DISCOVERY_ACROSS_FILESYSTEM",
+)
+TRUTHY_VALUES = frozenset({"1", "true", "yes", "on"})
+DEFAULT_FETCH_TTL = 300
+FETCH_STAMP_NAME = "claude-hook-last-fetch"
+# Pipe buffer and read size for make's potentially verbose lint output.
+MAKE_PIPE_BUFSIZE = 1 << 16
+TRUNCATION_MARKER = "\n... (output truncated) ...\n"
+TOOL_ENV_VARS = {"git": "POST_TURN_GIT", "make": "POST_TURN_MAKE"}
+MAKE_TARGETS_CACHE_NAME = "claude-hook-targets.json"
+# GNU make's default makefile search order.
+MAKEFILE_NAMES = ("GNUmakefile", "makefile", "Makefile")
+# No-op goal for make -qp, so question mode never walks the default goal.
+MAKE_PROBE_GOAL = ".post-turn-hook-probe"
+# Tools that cannot change the work tree; any other tool use counts as an edit.
+READ_ONLY_TOOLS = {
+    "Glob",
+    "Grep",
+    "LS",
+    "NotebookRead",
+    "Read",
+    "TodoWrite",
+    "WebFetch",
+    "WebSearch",
+}
+# How much of the transcript's end to read when looking for the turn start.
+TRANSCRIPT_TAIL_BYTES = 1 << 20
+# Makefiles small and plain enough to read directly instead of running make.
+MAKEFILE_SCAN_MAX_BYTES = 100_000
+MAKE_DYNAMIC_DIRECTIVES = {
+    "include",
+    "-include",
+    "sinclude",
+    "define",
+    "ifeq",
+    "ifneq",
+    "ifdef",
+    "ifndef",
+}
 
 
 def default_categories() -> dict[str, bool]:
@@ -80,7 +159,7 @@ class HookState:
     base_ref
         Base ref used for comparison.
     base_commit
-        Resolved merge-base commit.
+        Resolved merge-base commit, filled in only when reporting a block.
     changed_files
         Files changed relative to the base commit.
     categories
@@ -125,12 +204,118 @@ class RunStopChecksPreparation:
         Hook state populated during preparation.
     repo
         Resolved repository root when preparation succeeded.
+    make_targets
+        Waits for the make target enumeration started alongside
+        ``changed_files``, when the repository has a makefile.
     """
 
     ok: bool
     exit_code: int
     state: HookState
     repo: Path | None = None
+    make_targets: Callable[[], tuple[set[str] | None, str | None]] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class HookConfig:
+    """Hook settings read once from the environment.
+
+    Attributes
+    ----------
+    base_ref
+        Base git ref used for comparisons.
+    always_fetch
+        Whether to always fetch origin/main.
+    max_out
+        Maximum number of output bytes to capture per stream; the
+        ``POST_TURN_MAX_OUTPUT_CHARS`` name predates the byte budget.
+    compush
+        Whether to remind the agent to commit and push when dirty.
+    fetch_ttl
+        Seconds for which a previous hook fetch satisfies ``always_fetch``.
+    skip_if_no_edits
+        Whether to exit early on turns that used only read-only tools.
+    serial
+        Whether to run the code and Markdown make invocations one after
+        another instead of concurrently.
+    make_jobs
+        Parallel job count passed to ``make``, or None to omit ``--jobs``.
+    split_groups
+        Whether to run code and Markdown targets as separate ``make``
+        invocations instead of one.
+    """
+
+    base_ref: str = "origin/main"
+    always_fetch: bool = False
+    max_out: int = 12000
+    compush: bool = False
+    fetch_ttl: int = DEFAULT_FETCH_TTL
+    skip_if_no_edits: bool = False
+    serial: bool = False
+    make_jobs: int | None = None
+    split_groups: bool = False
+
+    @classmethod
+    def from_env(cls) -> HookConfig:
+        """Build the configuration from ``POST_TURN_*`` environment variables.
+
+        Returns
+        -------
+        HookConfig
+            Parsed configuration, with defaults for unset or invalid values.
+        """
+        env = os.environ
+        return cls(
+            base_ref=env.get("POST_TURN_BASE_REF", "origin/main"),
+            always_fetch=parse_bool_env(env.get("POST_TURN_ALWAYS_FETCH", "")),
+            max_out=parse_max_output(env.get("POST_TURN_MAX_OUTPUT_CHARS", "12000")),
+            compush=parse_bool_env(env.get("POST_TURN_COMPUSH", "")),
+            fetch_ttl=parse_fetch_ttl(env.get("POST_TURN_FETCH_TTL", "")),
+            skip_if_no_edits=parse_bool_env(env.get("POST_TURN_SKIP_IF_NO_EDITS", "")),
+            serial=parse_bool_env(env.get("POST_TURN_SERIAL", "")),
+            make_jobs=parse_make_jobs(env.get("POST_TURN_MAKE_JOBS", "")),
+            split_groups=parse_bool_env(env.get("POST_TURN_SPLIT_GROUPS", "")),
+        )
+
+
+@functools.cache
+def tool_path(name: str) -> str | None:
+    """Resolve an executable once per hook run.
+
+    ``POST_TURN_GIT``/``POST_TURN_MAKE`` pin the executable to resolve in
+    place of ``name``. Spawning the absolute path also spares each child its
+    own PATH search.
+
+    Parameters
+    ----------
+    name
+        Executable name, ``git`` or ``make``.
+
+    Returns
+    -------
+    str | None
+        Absolute path, or None when the executable (or the override) does
+        not resolve to an executable file.
+    """
+    override = os.environ.get(TOOL_ENV_VARS.get(name, ""), "")
+    return shutil.which(override or name)
+
+
+def tool_cmd(name: str) -> str:
+    """Return the resolved executable for ``name``, or ``name`` if unresolved.
+
+    Parameters
+    ----------
+    name
+        Executable name.
+
+    Returns
+    -------
+    str
+        Path to spawn; an unresolved name lets the spawn raise
+        ``FileNotFoundError`` as before.
+    """
+    return tool_path(name) or name
 
 
 def run(cmd: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
@@ -152,49 +337,383 @@ def run(cmd: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
         return subprocess.run(  # noqa: S603  # valid: command and args are controlled (no shell, no user-supplied command strings).
             cmd, cwd=str(cwd), text=True, capture_output=True, check=False
         )
-    except FileNotFoundError as exc:
-        if Path(exc.filename or "") != cwd:
-            raise
-        return subprocess.CompletedProcess(
-            args=cmd, returncode=1, stdout="", stderr=str(exc)
+    except (FileNotFoundError, NotADirectoryError) as exc:
+        return cwd_failure(cmd, cwd, exc)
+
+
+def run_bytes(cmd: list[str], cwd: Path) -> subprocess.CompletedProcess[bytes]:
+    """Run a command and capture its output undecoded.
+
+    For NUL-delimited path listings: paths need not be valid in the locale
+    encoding, so they are decoded one by one with ``os.fsdecode`` instead.
+
+    Parameters
+    ----------
+    cmd
+        Command and arguments to run.
+    cwd
+        Working directory for the subprocess.
+
+    Returns
+    -------
+    subprocess.CompletedProcess[bytes]
+        Completed process with captured output.
+    """
+    try:
+        return subprocess.run(  # noqa: S603  # valid: command and args are controlled (no shell, no user-supplied command strings).
+            cmd, cwd=str(cwd), capture_output=True, check=False
         )
-    except NotADirectoryError as exc:
+    except (FileNotFoundError, NotADirectoryError) as exc:
+        failed = cwd_failure(cmd, cwd, exc)
         return subprocess.CompletedProcess(
-            args=cmd, returncode=1, stdout="", stderr=str(exc)
+            args=cmd, returncode=failed.returncode, stdout=b"", stderr=failed.stderr.encode()
         )
 
 
-def truncate(text: str, max_chars: int) -> str:
-    """Truncate text to a maximum length.
+def run_status(cmd: list[str], cwd: Path) -> int:
+    """Run a command for its exit code alone.
+
+    Output goes to ``/dev/null``, so no pipes are created or drained. Use
+    ``run`` when the output feeds an error message.
+
+    Parameters
+    ----------
+    cmd
+        Command and arguments to run.
+    cwd
+        Working directory for the subprocess.
+
+    Returns
+    -------
+    int
+        Exit code of the command; 1 when ``cwd`` is unusable.
+    """
+    try:
+        return subprocess.run(  # noqa: S603  # valid: command and args are controlled (no shell, no user-supplied command strings).
+            cmd,
+            cwd=str(cwd),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        ).returncode
+    except (FileNotFoundError, NotADirectoryError) as exc:
+        return cwd_failure(cmd, cwd, exc).returncode
+
+
+def cwd_failure(
+    cmd: list[str], cwd: Path, exc: FileNotFoundError | NotADirectoryError
+) -> subprocess.CompletedProcess[str]:
+    """Turn an unusable working directory into a failed process result.
+
+    Parameters
+    ----------
+    cmd
+        Command that failed to start.
+    cwd
+        Working directory it was started in.
+    exc
+        Error raised while spawning.
+
+    Returns
+    -------
+    subprocess.CompletedProcess[str]
+        Result with exit code 1 and the error as stderr.
+
+    Raises
+    ------
+    FileNotFoundError
+        Re-raised when the missing file is the executable rather than ``cwd``.
+    """
+    if isinstance(exc, FileNotFoundError) and Path(exc.filename or "") != cwd:
+        raise exc
+    return subprocess.CompletedProcess(args=cmd, returncode=1, stdout="", stderr=str(exc))
+
+
+def run_git(args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
+    """Run a read-only git command without taking optional locks.
+
+    ``--no-optional-locks`` stops commands such as ``git status`` from
+    refreshing the index under ``index.lock``, so the hook neither waits on
+    nor blocks a concurrent commit in the user's editor. Commands that must
+    write (``git fetch``) go through ``run`` directly.
+
+    Parameters
+    ----------
+    args
+        Git subcommand and arguments, without the leading ``git``.
+    cwd
+        Working directory for the subprocess.
+
+    Returns
+    -------
+    subprocess.CompletedProcess[str]
+        Completed process with captured output.
+    """
+    return run(git_argv(args), cwd)
+
+
+def run_git_bytes(args: list[str], cwd: Path) -> subprocess.CompletedProcess[bytes]:
+    """Run a read-only git command and capture its output undecoded.
+
+    Parameters
+    ----------
+    args
+        Git subcommand and arguments, without the leading ``git``.
+    cwd
+        Working directory for the subprocess.
+
+    Returns
+    -------
+    subprocess.CompletedProcess[bytes]
+        Completed process with captured output.
+    """
+    return run_bytes(git_argv(args), cwd)
+
+
+def run_git_status(args: list[str], cwd: Path) -> int:
+    """Run a read-only git command for its exit code alone.
+
+    Parameters
+    ----------
+    args
+        Git subcommand and arguments, without the leading ``git``.
+    cwd
+        Working directory for the subprocess.
+
+    Returns
+    -------
+    int
+        Exit code of the command.
+    """
+    return run_status(git_argv(args), cwd)
+
+
+def git_argv(args: list[str]) -> list[str]:
+    """Build the argv for a read-only git command.
 
     Parameters
     ----------
-    text
-        Text to truncate.
-    max_chars
-        Maximum number of characters to keep.
+    args
+        Git subcommand and arguments, without the leading ``git``.
+
+    Returns
+    -------
+    list[str]
+        Full command line, taking no optional locks.
+    """
+    return [tool_cmd("git"), "--no-optional-locks", *args]
+
+
+def decode_utf8_head(data: bytes) -> str:
+    """Decode the start of a stream, dropping a character split at the end.
+
+    Parameters
+    ----------
+    data
+        Bytes cut from the start of the stream.
+
+    Returns
+    -------
+    str
+        Decoded text; other invalid bytes still become U+FFFD.
+    """
+    # Without final=True the decoder holds back an incomplete last sequence.
+    return codecs.getincrementaldecoder("utf-8")(errors="replace").decode(data)
+
+
+def decode_utf8_tail(data: bytes) -> str:
+    """Decode the end of a stream, dropping a character split at the start.
+
+    Parameters
+    ----------
+    data
+        Bytes cut from the end of the stream.
 
     Returns
     -------
     str
-        Truncated text with a placeholder if needed.
+        Decoded text; other invalid bytes still become U+FFFD.
+    """
+    # A UTF-8 sequence has at most three continuation bytes (0b10xxxxxx).
+    start = 0
+    while start < min(len(data), 3) and data[start] & 0xC0 == 0x80:
+        start += 1
+    return data[start:].decode(errors="replace")
+
+
+@dataclass
+class BoundedCapture:
+    """Keep the head and tail of a byte stream within a byte budget.
+
+    Mirrors the old capture-then-truncate behaviour: output that fits is
+    kept whole, otherwise the first and last halves of the budget survive
+    around ``TRUNCATION_MARKER``. Memory stays bounded by ``max_bytes``
+    however much the child writes. The budget counts bytes, so non-ASCII
+    output keeps fewer characters; a UTF-8 character split by either cut is
+    dropped rather than decoded to U+FFFD.
+
+    Attributes
+    ----------
+    max_bytes
+        Byte budget for the captured output.
+    head
+        First ``max_bytes`` bytes seen.
+    tail
+        Most recent chunks, holding at least the tail budget's worth of bytes.
+    tail_size
+        Total size of the chunks in ``tail``.
+    total
+        Number of bytes seen.
     """
-    if max_chars <= 0:
-        return ""
-    if len(text) <= max_chars:
-        return text
-    marker = "\n... (output truncated) ...\n"
-    if max_chars <= len(marker):
-        return text[:max_chars]
-    remaining = max_chars - len(marker)
-    head = remaining // 2
-    tail = remaining - head
-    return text[:head] + marker + text[-tail:]
+
+    max_bytes: int
+    head: bytearray = field(default_factory=bytearray)
+    tail: deque[bytes] = field(default_factory=deque)
+    tail_size: int = 0
+    total: int = 0
+
+    def _split(self) -> tuple[int, int]:
+        remaining = self.max_bytes - len(TRUNCATION_MARKER)
+        if remaining <= 0:
+            return max(self.max_bytes, 0), 0
+        head = remaining // 2
+        return head, remaining - head
+
+    def feed(self, chunk: bytes) -> None:
+        """Account for one chunk read from the stream."""
+        self.total += len(chunk)
+        room = self.max_bytes - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+        _head, tail_limit = self._split()
+        if tail_limit <= 0:
+            return
+        self.tail.append(chunk)
+        self.tail_size += len(chunk)
+        while self.tail_size - len(self.tail[0]) >= tail_limit:
+            self.tail_size -= len(self.tail.popleft())
+
+    def drain(self, stream: IO[bytes]) -> None:
+        """Read ``stream`` to EOF, feeding every chunk."""
+        while chunk := stream.read1(MAKE_PIPE_BUFSIZE):
+            self.feed(chunk)
+
+    def text(self) -> str:
+        """Return the captured text, with the marker if anything was dropped."""
+        if self.max_bytes <= 0:
+            return ""
+        if self.total <= self.max_bytes:
+            return self.head.decode(errors="replace")
+        head_limit, tail_limit = self._split()
+        head = decode_utf8_head(bytes(self.head[:head_limit]))
+        if tail_limit <= 0:
+            return head
+        tail = decode_utf8_tail(b"".join(self.tail)[-tail_limit:])
+        return head + TRUNCATION_MARKER + tail
+
+
+def run_bounded(
+    cmd: list[str], cwd: Path, max_bytes: int
+) -> subprocess.CompletedProcess[str]:
+    """Run a command, keeping at most ``max_bytes`` of each output stream.
+
+    Used for ``make``, whose lint output can run to megabytes. Reader threads
+    drain both pipes as the child writes, so the child never blocks on a full
+    pipe and the hook's memory does not grow with the output.
+
+    Parameters
+    ----------
+    cmd
+        Command and arguments to run.
+    cwd
+        Working directory for the subprocess.
+    max_bytes
+        Maximum number of bytes kept per stream.
+
+    Returns
+    -------
+    subprocess.CompletedProcess[str]
+        Completed process with bounded output.
+    """
+    try:
+        proc = subprocess.Popen(  # noqa: S603  # valid: command and args are controlled (no shell, no user-supplied command strings).
+            cmd,
+            cwd=str(cwd),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=MAKE_PIPE_BUFSIZE,
+        )
+    except (FileNotFoundError, NotADirectoryError) as exc:
+        return cwd_failure(cmd, cwd, exc)
+
+    captures = (BoundedCapture(max_bytes), BoundedCapture(max_bytes))
+    with proc:
+        readers = [
+            threading.Thread(target=capture.drain, args=(stream,), daemon=True)
+            for capture, stream in zip(captures, (proc.stdout, proc.stderr))
+        ]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+        proc.wait()
+    return subprocess.CompletedProcess(
+        args=cmd,
+        returncode=proc.returncode,
+        stdout=captures[0].text(),
+        stderr=captures[1].text(),
+    )
+
+
+def find_repo_root(start_cwd: Path) -> Path | None:
+    """Find the work tree root by walking up to a ``.git`` entry, without git.
+
+    Only the plain layout is handled: any discovery override in the
+    environment, a ``.git`` on another filesystem, a directory owned by
+    someone else (git's ``safe.directory`` check), or starting inside a git
+    directory all return None so that callers ask git instead.
+
+    Parameters
+    ----------
+    start_cwd
+        Directory to resolve from.
+
+    Returns
+    -------
+    Path | None
+        The work tree root, or None when git must decide.
+    """
+    if any(var in os.environ for var in GIT_DISCOVERY_ENV_VARS):
+        return None
+    try:
+        start = start_cwd.resolve(strict=True)
+        device = start.stat().st_dev
+    except (OSError, RuntimeError):
+        return None
+    for d in (start, *start.parents):
+        if d.name == ".git":
+            return None
+        try:
+            st = d.stat()
+        except OSError:
+            return None
+        if st.st_dev != device:
+            return None
+        if not (d / ".git").exists():
+            continue
+        gdir = git_dir(d)
+        if gdir is None or not (gdir / "HEAD").is_file() or st.st_uid != os.geteuid():
+            return None
+        return d
+    return None
 
 
 def repo_root(start_cwd: Path) -> tuple[Path | None, str | None]:
     """Resolve the git repository root for a starting directory.
 
+    The ``.git`` lookup in ``find_repo_root`` settles the usual layout
+    without spawning git; anything else goes to ``git rev-parse``.
+
     Parameters
     ----------
     start_cwd
@@ -205,7 +724,10 @@ def repo_root(start_cwd: Path) -> tuple[Path | None, str | None]:
     tuple[Path | None, str | None]
         Repository root path and error message, if any.
     """
-    p = run(["git", "rev-parse", "--show-toplevel"], start_cwd)
+    found = find_repo_root(start_cwd)
+    if found is not None:
+        return found, None
+    p = run_git(["rev-parse", "--show-toplevel"], start_cwd)
     if p.returncode != 0:
         err = (p.stderr.strip() or p.stdout.strip() or "not a git repository")
         return None, err
@@ -228,7 +750,7 @@ def ensure_origin_remote(repo: Path) -> tuple[bool, str | None]:
     tuple[bool, str | None]
         ok and error message, if any.
     """
-    remotes = run(["git", "remote"], repo)
+    remotes = run_git(["remote"], repo)
     if remotes.returncode != 0:
         return False, f"git remote failed: {remotes.stderr.strip() or remotes.stdout.strip()}"
     if "origin" not in remotes.stdout.split():
@@ -236,6 +758,78 @@ def ensure_origin_remote(repo: Path) -> tuple[bool, str | None]:
     return True, None
 
 
+def git_dir(repo: Path) -> Path | None:
+    """Locate the git directory for a repository root without spawning git.
+
+    Parameters
+    ----------
+    repo
+        Repository root path.
+
+    Returns
+    -------
+    Path | None
+        The git directory, or None when it cannot be determined. Linked
+        worktrees and submodules store a ``gitdir:`` pointer in a ``.git``
+        file, which is followed.
+    """
+    dot_git = repo / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    try:
+        pointer = dot_git.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    prefix = "gitdir:"
+    if not pointer.startswith(prefix):
+        return None
+    return repo / pointer[len(prefix):].strip()
+
+
+def fetch_stamp_fresh(repo: Path, ttl: int) -> bool:
+    """Check whether the hook fetched origin/main within the last ``ttl`` seconds.
+
+    Parameters
+    ----------
+    repo
+        Repository root path.
+    ttl
+        Freshness window in seconds; non-positive values are never fresh.
+
+    Returns
+    -------
+    bool
+        True when the fetch stamp exists and is younger than ``ttl``.
+    """
+    if ttl <= 0:
+        return False
+    gdir = git_dir(repo)
+    if gdir is None:
+        return False
+    try:
+        stamped = (gdir / FETCH_STAMP_NAME).stat().st_mtime
+    except OSError:
+        return False
+    return time.time() - stamped < ttl
+
+
+def touch_fetch_stamp(repo: Path) -> None:
+    """Record a successful fetch for ``fetch_stamp_fresh``.
+
+    Parameters
+    ----------
+    repo
+        Repository root path.
+    """
+    gdir = git_dir(repo)
+    if gdir is None:
+        return
+    try:
+        (gdir / FETCH_STAMP_NAME).touch()
+    except OSError:
+        pass
+
+
 def fetch_origin_main(repo: Path) -> tuple[bool, str | None]:
     """Fetch origin/main.
 
@@ -249,9 +843,10 @@ def fetch_origin_main(repo: Path) -> tuple[bool, str | None]:
     tuple[bool, str | None]
         ok and error message, if any.
     """
-    fetch = run(["git", "fetch", "--quiet", "origin", "main"], repo)
+    fetch = run([tool_cmd("git"), "fetch", "--quiet", "origin", "main"], repo)
     if fetch.returncode != 0:
         return False, f"git fetch origin main failed: {fetch.stderr.strip() or fetch.stdout.strip()}"
+    touch_fetch_stamp(repo)
     return True, None
 
 
@@ -270,12 +865,13 @@ def ref_exists(repo: Path, ref: str) -> tuple[bool, str | None]:
     tuple[bool, str | None]
         True if the ref exists, otherwise False and an error if the check failed.
     """
-    verify = run(["git", "show-ref", "--verify", "--quiet", ref], repo)
-    if verify.returncode == 0:
-        return True, None
-    if verify.returncode == 1:
-        return False, None
-    return False, verify.stderr.strip() or verify.stdout.strip() or "git show-ref failed"
+    # for-each-ref only lists refs that exist and point at an object, so a
+    # hit both finds and resolves the ref in one spawn.
+    listed = run_git(["for-each-ref", "--format=%(refname)", ref], repo)
+    if listed.returncode != 0:
+        return False, listed.stderr.strip() or listed.stdout.strip() or "git for-each-ref failed"
+    # Patterns also match refs below ref/, so require the exact name.
+    return ref in listed.stdout.splitlines(), None
 
 
 def verify_ref(repo: Path, ref: str) -> tuple[bool, str | None]:
@@ -293,43 +889,19 @@ def verify_ref(repo: Path, ref: str) -> tuple[bool, str | None]:
     tuple[bool, str | None]
         ok and error message, if any.
     """
-    rp = run(["git", "rev-parse", "--verify", "--quiet", ref], repo)
-    if rp.returncode != 0:
+    if run_git_status(["rev-parse", "--verify", "--quiet", ref], repo) != 0:
         return False, f"Cannot resolve {ref}"
     return True, None
 
 
-def ensure_origin_main(repo: Path, *, always_fetch: bool) -> tuple[bool, str | None, bool]:
-    """Ensure origin/main is present and resolvable.
-
-    Parameters
-    ----------
-    repo
-        Repository root path.
-    always_fetch
-        If True, always fetch origin/main.
-
-    Returns
-    -------
-    tuple[bool, str | None, bool]
-        ok, error message (if any), fetched.
-    """
-    ok, err = ensure_origin_remote(repo)
-    if not ok:
-        return False, err, False
-
-    ok, err, fetched = ensure_origin_main_ref(repo, always_fetch=always_fetch)
-    if not ok:
-        return False, err, fetched
-
-    ok, err = verify_ref(repo, "origin/main")
-    if not ok:
-        return False, err, fetched
-    return True, None, fetched
-
+def ensure_origin_main(
+    repo: Path, *, always_fetch: bool, fetch_ttl: int = 0
+) -> tuple[bool, str | None, bool]:
+    """Ensure origin/main is present and resolvable, fetching if needed.
 
-def ensure_origin_main_ref(repo: Path, *, always_fetch: bool) -> tuple[bool, str | None, bool]:
-    """Ensure refs/remotes/origin/main exists, fetching if needed.
+    An existing ``refs/remotes/origin/main`` settles the common case with a
+    single ``git for-each-ref``; the origin remote is only checked when a
+    fetch is needed.
 
     Parameters
     ----------
@@ -337,23 +909,25 @@ def ensure_origin_main_ref(repo: Path, *, always_fetch: bool) -> tuple[bool, str
         Repository root path.
     always_fetch
         If True, always fetch origin/main.
+    fetch_ttl
+        Seconds for which a previous hook fetch satisfies ``always_fetch``;
+        a missing ref is fetched regardless.
 
     Returns
     -------
     tuple[bool, str | None, bool]
         ok, error message (if any), fetched.
     """
-    if always_fetch:
-        ok, err = fetch_origin_main(repo)
-        if not ok:
-            return False, err, True
-        return True, None, True
+    if not always_fetch or fetch_stamp_fresh(repo, fetch_ttl):
+        exists, err = ref_exists(repo, "refs/remotes/origin/main")
+        if err:
+            return False, err, False
+        if exists:
+            return True, None, False
 
-    exists, err = ref_exists(repo, "refs/remotes/origin/main")
-    if err:
+    ok, err = ensure_origin_remote(repo)
+    if not ok:
         return False, err, False
-    if exists:
-        return True, None, False
 
     ok, err = fetch_origin_main(repo)
     if not ok:
@@ -373,6 +947,7 @@ def ensure_base_ref(
     base_ref: str,
     *,
     always_fetch: bool,
+    fetch_ttl: int = 0,
 ) -> tuple[bool, str | None, bool]:
     """Ensure a base ref is available and resolvable.
 
@@ -384,6 +959,8 @@ def ensure_base_ref(
         Base git ref used to compute the merge-base.
     always_fetch
         If True, always fetch origin/main when base_ref is origin/main.
+    fetch_ttl
+        Seconds for which a previous hook fetch satisfies ``always_fetch``.
 
     Returns
     -------
@@ -391,7 +968,9 @@ def ensure_base_ref(
         ok, error message (if any), fetched.
     """
     if base_ref == "origin/main":
-        return ensure_origin_main(repo, always_fetch=always_fetch)
+        return ensure_origin_main(
+            repo, always_fetch=always_fetch, fetch_ttl=fetch_ttl
+        )
 
     ok, err = verify_ref(repo, base_ref)
     if not ok:
@@ -402,6 +981,12 @@ def ensure_base_ref(
 def merge_base(repo: Path, base_ref: str) -> tuple[str | None, str | None]:
     """Compute the merge-base of base_ref and HEAD.
 
+    When HEAD descends from base_ref (the usual feature-branch shape),
+    base_ref itself is the merge-base. ``git merge-base --is-ancestor`` can
+    confirm that without the full common-ancestor walk that makes a plain
+    ``git merge-base`` slow on histories with a deep one-sided side, so it
+    is tried first.
+
     Parameters
     ----------
     repo
@@ -414,7 +999,13 @@ def merge_base(repo: Path, base_ref: str) -> tuple[str | None, str | None]:
     tuple[str | None, str | None]
         Merge-base commit hash and error message, if any.
     """
-    p = run(["git", "merge-base", base_ref, "HEAD"], repo)
+    if run_git_status(["merge-base", "--is-ancestor", base_ref, "HEAD"], repo) == 0:
+        tip = run_git(["rev-parse", "--verify", "--quiet", f"{base_ref}^{{commit}}"], repo)
+        base = tip.stdout.strip()
+        if tip.returncode == 0 and base:
+            return base, None
+
+    p = run_git(["merge-base", base_ref, "HEAD"], repo)
     if p.returncode != 0:
         return None, f"git merge-base {base_ref} HEAD failed: {p.stderr.strip() or p.stdout.strip()}"
     base = p.stdout.strip()
@@ -423,44 +1014,94 @@ def merge_base(repo: Path, base_ref: str) -> tuple[str | None, str | None]:
     return base, None
 
 
-def changed_files(repo: Path, base_commit: str) -> tuple[list[str] | None, str | None]:
-    """List files changed relative to a base commit.
+def git_failure(args: list[str], p: subprocess.CompletedProcess[bytes]) -> str:
+    """Describe a failed git command whose output was captured as bytes.
+
+    Parameters
+    ----------
+    args
+        Git subcommand and arguments, without the leading ``git``.
+    p
+        Completed process.
+
+    Returns
+    -------
+    str
+        Error message quoting git's stderr, or stdout when stderr is empty.
+    """
+    detail = (p.stderr.strip() or p.stdout.strip()).decode(errors="replace")
+    return f"git {' '.join(args)} failed: {detail}"
+
+
+def changed_files(repo: Path, base_ref: str) -> tuple[list[str] | None, str | None]:
+    """List files changed relative to the merge-base of a base ref and HEAD.
+
+    Only paths matching ``CHANGE_PATHSPECS`` are reported.
 
     Parameters
     ----------
     repo
         Repository root path.
-    base_commit
-        Base commit hash for diffing.
+    base_ref
+        Base ref; git computes the merge-base with HEAD itself.
 
     Returns
     -------
     tuple[list[str] | None, str | None]
         Sorted list of changed files and error message, if any.
     """
-    changed: set[str] = set()
+    # Staged, unstaged and untracked (but not ignored) relative to HEAD in one
+    # pass. Untracked directories are listed file by file so their extensions
+    # still reach detect_categories. Submodules are gitlinks no category
+    # covers, so git need not spawn itself inside each to check dirtiness.
+    status_args = [
+        "status",
+        "-z",
+        "--porcelain=v1",
+        "--untracked-files=all",
+        "--ignore-submodules=all",
+        "--no-renames",
+        "--",
+        *CHANGE_PATHSPECS,
+    ]
 
-    # Tracked changes (unstaged and staged) relative to base_commit
-    for args in (
-        ["git", "diff", "--name-only", base_commit],
-        ["git", "diff", "--cached", "--name-only", base_commit],
-    ):
-        p = run(args, repo)
-        if p.returncode != 0:
-            return None, f"{' '.join(args)} failed: {p.stderr.strip() or p.stdout.strip()}"
-        for line in p.stdout.splitlines():
-            line = line.strip()
-            if line:
-                changed.add(line)
-
-    # Untracked (but not ignored)
-    u = run(["git", "ls-files", "--others", "--exclude-standard"], repo)
-    if u.returncode != 0:
-        return None, f"git ls-files failed: {u.stderr.strip() or u.stdout.strip()}"
-    for line in u.stdout.splitlines():
-        line = line.strip()
-        if line:
-            changed.add(line)
+    # Commits on HEAD since the merge-base with base_ref; none when HEAD is
+    # base_ref itself, so that case needs no separate check. diff-tree is
+    # plumbing: it never touches the index or work tree and skips the rename
+    # detection porcelain diff enables by default, so both sides of a rename
+    # are listed.
+    diff_args = [
+        "diff-tree",
+        "-r",
+        "-z",
+        "--name-only",
+        "--merge-base",
+        base_ref,
+        "HEAD",
+        "--",
+        *CHANGE_PATHSPECS,
+    ]
+
+    # The two reads are independent, so git status (which stats the work
+    # tree) runs while diff-tree walks the commit trees. A plain thread
+    # rather than concurrent.futures keeps that package's logging import off
+    # this path.
+    statuses: list[subprocess.CompletedProcess[bytes]] = []
+    worker = threading.Thread(target=lambda: statuses.append(run_git_bytes(status_args, repo)))
+    worker.start()
+    diff = run_git_bytes(diff_args, repo)
+    worker.join()
+
+    if diff.returncode != 0:
+        return None, git_failure(diff_args, diff)
+    if not statuses:
+        return None, "git status failed"
+    status = statuses[0]
+    if status.returncode != 0:
+        return None, git_failure(status_args, status)
+    changed = {os.fsdecode(name) for name in diff.stdout.split(b"\0") if name}
+    # Each entry is "XY <path>"; --no-renames keeps it to one path per entry.
+    changed.update(os.fsdecode(entry[3:]) for entry in status.stdout.split(b"\0") if len(entry) > 3)
 
     return sorted(changed), None
 
@@ -479,16 +1120,16 @@ def has_uncommitted_changes(repo: Path) -> tuple[bool | None, str | None]:
         True if dirty, False if clean, None on error; and an error message.
     """
     for args in (
-        ["git", "diff", "--quiet"],
-        ["git", "diff", "--cached", "--quiet"],
+        ["diff", "--quiet"],
+        ["diff", "--cached", "--quiet"],
     ):
-        p = run(args, repo)
+        p = run_git(args, repo)
         if p.returncode == 1:
             return True, None
         if p.returncode != 0:
-            return None, f"{' '.join(args)} failed: {p.stderr.strip() or p.stdout.strip()}"
+            return None, f"git {' '.join(args)} failed: {p.stderr.strip() or p.stdout.strip()}"
 
-    u = run(["git", "ls-files", "--others", "--exclude-standard"], repo)
+    u = run_git(["ls-files", "--others", "--exclude-standard"], repo)
     if u.returncode != 0:
         return None, f"git ls-files failed: {u.stderr.strip() or u.stdout.strip()}"
     if u.stdout.strip():
@@ -510,7 +1151,7 @@ def get_upstream_ref(repo: Path) -> tuple[str | None, str | None]:
     tuple[str | None, str | None]
         Upstream ref name (e.g. ``origin/main``) and error message, if any.
     """
-    p = run(["git", "rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"], repo)
+    p = run_git(["rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"], repo)
     if p.returncode != 0:
         return None, p.stderr.strip() or p.stdout.strip() or "no upstream configured"
     ref = p.stdout.strip()
@@ -534,7 +1175,7 @@ def has_unpushed_commits(repo: Path, upstream: str) -> tuple[bool | None, str |
     tuple[bool | None, str | None]
         True if local commits are ahead, False if not, None on error; and an error message.
     """
-    p = run(["git", "rev-list", "--count", f"{upstream}..HEAD"], repo)
+    p = run_git(["rev-list", "--count", f"{upstream}..HEAD"], repo)
     if p.returncode != 0:
         return None, (
             f"git rev-list --count {upstream}..HEAD failed: "
@@ -566,13 +1207,17 @@ def detect_categories(files: list[str]) -> dict[str, bool]:
     """
     cats = default_categories()
     for f in files:
-        ext = Path(f).suffix.lower()
-        if ext in PY_TS_EXTS:
-            cats["python_ts"] = True
-        if ext in RUST_EXTS:
-            cats["rust"] = True
-        if ext in MD_EXTS:
-            cats["markdown"] = True
+        dot = f.rfind(".")
+        # Match Path.suffix: the dot must fall inside the final component
+        # and a leading dot (".md" dotfile) is not an extension.
+        if dot <= f.rfind("/") + 1:
+            continue
+        cat = EXT_TO_CAT.get(f[dot:].lower())
+        if cat is not None and not cats[cat]:
+            cats[cat] = True
+            # Nothing left to learn once every category has fired.
+            if all(cats.values()):
+                break
     return cats
 
 
@@ -590,16 +1235,27 @@ def parse_make_targets(make_stdout: str) -> set[str]:
         Parsed make target names.
     """
     targets: set[str] = set()
-    rule_re = re.compile(r"^([^\s:#=]+(?:\s+[^\s:#=]+)*)\s*::?\s*.*$")
+    not_target = False
     for line in make_stdout.splitlines():
-        if not line:
+        if line == "# Not a target:":
+            # make -p marks files it only saw as prerequisites this way.
+            not_target = True
             continue
-        if line.startswith(("#", "\t", " ")):
+        if not line or line[0] in "#\t ":
             continue
-        m = rule_re.match(line)
-        if not m:
+        idx = line.find(":")
+        if idx <= 0:
+            continue
+        # ":=" and "::=" are simple variable assignments, not rules.
+        if line[idx + 1 : idx + 2] == "=" or line[idx + 1 : idx + 3] == ":=":
+            continue
+        lhs = line[:idx]
+        # A "=" or "#" before the colon means the colon sits in a value.
+        if "=" in lhs or "#" in lhs:
+            continue
+        if not_target:
+            not_target = False
             continue
-        lhs = m.group(1)
         for t in lhs.split():
             if "%" in t:
                 continue
@@ -607,26 +1263,236 @@ def parse_make_targets(make_stdout: str) -> set[str]:
     return targets
 
 
-def is_missing_makefile(output: str) -> bool:
-    """Check output for a missing Makefile condition.
+def database_files_section(make_stdout: str) -> str:
+    """Cut a make -p database dump down to its "# Files" section.
+
+    The variables section before it, environment included, is usually the
+    bulk of the dump and never holds rules.
 
     Parameters
     ----------
-    output
-        Combined output from make.
+    make_stdout
+        Stdout from make -qp.
 
     Returns
     -------
-    bool
-        True if the output indicates no Makefile was found.
+    str
+        The rules part of the dump, or the whole text when the section
+        headers are not found.
+    """
+    start = make_stdout.find("\n# Files\n")
+    if start < 0:
+        return make_stdout
+    end = make_stdout.find("\n# VPATH Search Paths\n", start)
+    return make_stdout[start : end if end >= 0 else len(make_stdout)]
+
+
+def makefile_cache_key(repo: Path) -> list[Any] | None:
+    """Fingerprint the makefile ``make`` would read in a repository.
+
+    Parameters
+    ----------
+    repo
+        Repository root path.
+
+    Returns
+    -------
+    list[Any] | None
+        ``[name, mtime_ns, size]`` of the first makefile found, or None when
+        there is none.
+    """
+    for name in MAKEFILE_NAMES:
+        try:
+            st = (repo / name).stat()
+        except OSError:
+            continue
+        return [name, st.st_mtime_ns, st.st_size]
+    return None
+
+
+def file_fingerprint(repo: Path, name: str) -> list[Any]:
+    """Fingerprint a makefile dependency by path, mtime, and size.
+
+    Parameters
+    ----------
+    repo
+        Repository root path that relative names resolve against.
+    name
+        File name as make reported or included it.
+
+    Returns
+    -------
+    list[Any]
+        ``[name, mtime_ns, size]``, with None for both when the file is
+        missing so that creating it later still invalidates the cache.
+    """
+    try:
+        st = (repo / name).stat()
+    except OSError:
+        return [name, None, None]
+    return [name, st.st_mtime_ns, st.st_size]
+
+
+def make_dump_dependencies(repo: Path, make_stdout: str) -> list[str]:
+    """List the files a ``make -qp`` run read, plus optional includes it skipped.
+
+    Parameters
+    ----------
+    repo
+        Repository root path.
+    make_stdout
+        Stdout from make -qp.
+
+    Returns
+    -------
+    list[str]
+        ``MAKEFILE_LIST`` from the database dump followed by any literal
+        ``-include``/``sinclude`` operands in those files that did not exist.
+    """
+    read: list[str] = []
+    for line in make_stdout.splitlines():
+        if line.startswith("MAKEFILE_LIST :="):
+            read = line[len("MAKEFILE_LIST :="):].split()
+            break
+    deps = dict.fromkeys(read)
+    for name in read:
+        try:
+            text = (repo / name).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        for line in text.replace("\\\n", " ").splitlines():
+            words = line.split()
+            if not words or words[0] not in ("include", "-include", "sinclude"):
+                continue
+            for operand in words[1:]:
+                if not any(c in operand for c in "$*?["):
+                    deps.setdefault(operand)
+    return list(deps)
+
+
+def load_cached_make_targets(repo: Path, key: list[Any]) -> set[str] | None:
+    """Load make targets cached for a makefile fingerprint.
+
+    Every included makefile recorded with the entry must also be unchanged.
+
+    Parameters
+    ----------
+    repo
+        Repository root path.
+    key
+        Fingerprint from ``makefile_cache_key``.
+
+    Returns
+    -------
+    set[str] | None
+        Cached targets, or None on a miss or unreadable cache.
+    """
+    gdir = git_dir(repo)
+    if gdir is None:
+        return None
+    try:
+        with (gdir / MAKE_TARGETS_CACHE_NAME).open(encoding="utf-8") as fh:
+            cached = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    match cached:
+        case {
+            "key": list() as cached_key,
+            "targets": list() as targets,
+            "deps": list() as deps,
+        } if cached_key == key and all(
+            isinstance(dep, list) and dep and file_fingerprint(repo, str(dep[0])) == dep
+            for dep in deps
+        ):
+            return {t for t in targets if isinstance(t, str)}
+        case _:
+            return None
+
+
+def save_cached_make_targets(
+    repo: Path, key: list[Any], targets: set[str], deps: list[str] | None = None
+) -> None:
+    """Persist make targets for a makefile fingerprint.
+
+    Parameters
+    ----------
+    repo
+        Repository root path.
+    key
+        Fingerprint from ``makefile_cache_key``.
+    targets
+        Targets to cache.
+    deps
+        Other files whose changes must invalidate the entry, such as
+        included makefiles.
     """
-    lowered = output.lower()
-    return "no makefile found" in lowered
+    gdir = git_dir(repo)
+    if gdir is None:
+        return
+    cache = gdir / MAKE_TARGETS_CACHE_NAME
+    tmp = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(
+            json.dumps(
+                {
+                    "key": key,
+                    "targets": sorted(targets),
+                    "deps": [file_fingerprint(repo, dep) for dep in deps or ()],
+                }
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, cache)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def scan_makefile_targets(makefile: Path) -> set[str] | None:
+    """Read rule targets straight from a self-contained makefile.
+
+    Parameters
+    ----------
+    makefile
+        Path of the makefile to scan.
+
+    Returns
+    -------
+    set[str] | None
+        Targets found, or None when the makefile uses includes,
+        conditionals, ``define``/``eval``, or computed target names that
+        only ``make`` itself can resolve.
+    """
+    if os.environ.get("MAKEFILES"):
+        return None
+    try:
+        text = makefile.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    # Join backslash continuations as make does so wrapped values are not
+    # mistaken for rules.
+    text = text.replace("\\\n", " ")
+    if "$(eval" in text or "${eval" in text or ".RECIPEPREFIX" in text:
+        return None
+    for line in text.splitlines():
+        words = line.split(maxsplit=1)
+        if words and words[0] in MAKE_DYNAMIC_DIRECTIVES:
+            return None
+    targets = parse_make_targets(text)
+    if not targets or any("$" in t for t in targets):
+        return None
+    return targets
 
 
 def get_make_targets(repo: Path) -> tuple[set[str] | None, str | None]:
     """Collect available make targets from a repository.
 
+    Results are cached in the git directory keyed by the makefile's name,
+    mtime, and size, and by those of every makefile it included, so
+    unchanged makefiles skip the ``make -qp`` run.
+    Small self-contained makefiles are scanned directly and never spawn
+    ``make`` at all. GNU make before 3.82 lacks ``--eval``, so if make
+    rejects it the dump is repeated without the probe goal.
+
     Parameters
     ----------
     repo
@@ -637,19 +1503,76 @@ def get_make_targets(repo: Path) -> tuple[set[str] | None, str | None]:
     tuple[set[str] | None, str | None]
         Target set and error message, if any.
     """
+    key = makefile_cache_key(repo)
+    if key is None:
+        # Without a makefile there are no targets, and nothing for make to
+        # read that could say otherwise.
+        return set(), None
+    cached = load_cached_make_targets(repo, key)
+    if cached is not None:
+        return cached, None
+    if key[2] <= MAKEFILE_SCAN_MAX_BYTES:
+        scanned = scan_makefile_targets(repo / key[0])
+        if scanned is not None:
+            return scanned, None
+
+    # -r/-R keep make's built-in suffix rules and variables out of the
+    # database dump; they are never check targets and dominate its size.
+    base_cmd = [
+        tool_cmd("make"),
+        "-qp",
+        "--no-builtin-rules",
+        "--no-builtin-variables",
+        "--no-print-directory",
+    ]
+    # Questioning an empty goal instead of the default one skips the
+    # prerequisite walk, and any $(MAKE) recipe lines -q would still run.
+    probe = [f"--eval={MAKE_PROBE_GOAL}: ; @:", MAKE_PROBE_GOAL]
     try:
-        p = run(["make", "-qp", "--no-print-directory"], repo)
+        p = run([*base_cmd, *probe], repo)
+        if p.returncode == 2 and "--eval" in p.stderr:
+            p = run(base_cmd, repo)
     except FileNotFoundError:
         return None, "make not found on PATH"
 
     # make -q can return 0 or 1 without being an error; 2 means failure
     if p.returncode == 2:
         combined = f"{p.stderr.strip()}\n{p.stdout.strip()}".strip()
-        if is_missing_makefile(combined):
-            return set(), None
         return None, combined or "make -qp failed"
 
-    return parse_make_targets(p.stdout), None
+    targets = parse_make_targets(database_files_section(p.stdout))
+    targets.discard(MAKE_PROBE_GOAL)
+    save_cached_make_targets(repo, key, targets, make_dump_dependencies(repo, p.stdout))
+    return targets, None
+
+
+def start_make_targets(repo: Path) -> Callable[[], tuple[set[str] | None, str | None]]:
+    """Enumerate make targets on a background thread.
+
+    Starting this before ``changed_files`` lets a cache-missing ``make -qp``
+    overlap the diff-tree and status runs instead of following them.
+
+    Parameters
+    ----------
+    repo
+        Repository root path.
+
+    Returns
+    -------
+    Callable[[], tuple[set[str] | None, str | None]]
+        Waits for the enumeration and returns ``get_make_targets``' result.
+    """
+    result: list[tuple[set[str] | None, str | None]] = []
+    # Not a daemon: a turn with nothing to check still lets the enumeration
+    # finish and refresh the target cache before the hook exits.
+    worker = threading.Thread(target=lambda: result.append(get_make_targets(repo)))
+    worker.start()
+
+    def wait() -> tuple[set[str] | None, str | None]:
+        worker.join()
+        return result[0] if result else (None, "make target enumeration failed")
+
+    return wait
 
 
 def dedup_preserve_order(items: list[str]) -> list[str]:
@@ -665,19 +1588,18 @@ def dedup_preserve_order(items: list[str]) -> list[str]:
     list[str]
         Deduplicated items in original order.
     """
-    out: list[str] = []
-    seen: set[str] = set()
-    for x in items:
-        if x in seen:
-            continue
-        seen.add(x)
-        out.append(x)
-    return out
+    return list(dict.fromkeys(items))
 
 
-def run_make(repo: Path, kind: str, targets: list[str], max_out: int) -> dict[str, Any]:
+def run_make(
+    repo: Path, kind: str, targets: list[str], max_out: int, jobs: int | None = None
+) -> dict[str, Any]:
     """Run make targets and capture output.
 
+    With ``jobs``, targets build in parallel and ``--output-sync=target``
+    keeps each target's output together. GNU make before 4.0 lacks that
+    option, so the run is repeated without either flag if make rejects it.
+
     Parameters
     ----------
     repo
@@ -687,7 +1609,9 @@ def run_make(repo: Path, kind: str, targets: list[str], max_out: int) -> dict[st
     targets
         Make targets to run.
     max_out
-        Maximum number of output characters to capture.
+        Maximum number of output bytes to capture per stream.
+    jobs
+        Parallel job count for make, or None to run targets one at a time.
 
     Returns
     -------
@@ -697,8 +1621,12 @@ def run_make(repo: Path, kind: str, targets: list[str], max_out: int) -> dict[st
     if not targets:
         return {"kind": kind, "cmd": "", "exit_code": 0, "stdout": "", "stderr": ""}
 
+    base_cmd = [tool_cmd("make"), "--keep-going", "--no-print-directory"]
+    job_flags = [f"--jobs={jobs}", "--output-sync=target"] if jobs else []
     try:
-        p = run(["make", "--no-print-directory", *targets], repo)
+        p = run_bounded([*base_cmd, *job_flags, *targets], repo, max_out)
+        if job_flags and p.returncode == 2 and "--output-sync" in p.stderr:
+            p = run_bounded([*base_cmd, *targets], repo, max_out)
     except FileNotFoundError as exc:
         return {
             "kind": kind,
@@ -711,11 +1639,56 @@ def run_make(repo: Path, kind: str, targets: list[str], max_out: int) -> dict[st
         "kind": kind,
         "cmd": "make " + " ".join(targets),
         "exit_code": int(p.returncode),
-        "stdout": truncate(p.stdout, max_out),
-        "stderr": truncate(p.stderr, max_out),
+        "stdout": p.stdout,
+        "stderr": p.stderr,
     }
 
 
+def run_make_buckets(
+    repo: Path,
+    buckets: list[tuple[str, list[str]]],
+    max_out: int,
+    *,
+    serial: bool = False,
+    jobs: int | None = None,
+) -> list[dict[str, Any]]:
+    """Run make target buckets concurrently.
+
+    The buckets share no state, so each gets its own ``make`` process and the
+    wall time is that of the slowest bucket rather than the sum.
+
+    Parameters
+    ----------
+    repo
+        Repository root path.
+    buckets
+        ``(kind, targets)`` pairs, one ``make`` invocation each.
+    max_out
+        Maximum number of output bytes to capture per stream.
+    serial
+        Run the buckets one after another, for linters that contend for a
+        shared cache or lock.
+    jobs
+        Parallel job count passed to each ``make``.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        Execution metadata for each bucket, in the order given.
+    """
+    if serial or len(buckets) <= 1:
+        return [run_make(repo, kind, targets, max_out, jobs) for kind, targets in buckets]
+
+    # Imported here: concurrent.futures pulls in logging, which costs more at
+    # startup than most no-op turns spend in total.
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=len(buckets)) as pool:
+        return list(
+            pool.map(lambda bucket: run_make(repo, *bucket, max_out, jobs), buckets)
+        )
+
+
 def format_reason(state: HookState) -> str:
     """Format a blocking reason for hook output.
 
@@ -729,60 +1702,63 @@ def format_reason(state: HookState) -> str:
     str
         Human-readable reason string.
     """
-    lines: list[str] = []
-    lines.append("Post-turn checks failed.")
+    lines = ["Post-turn checks failed."]
 
     if state.error:
-        lines.append("")
-        lines.append(f"Error: {state.error}")
+        lines.extend(("", f"Error: {state.error}"))
 
     base_ref = state.base_ref or "?"
     base_commit = state.base_commit or "?"
-    lines.append("")
-    lines.append(f"Diff base: {base_ref} ({base_commit})")
-
     changed = state.changed_files
-    lines.append("")
-    lines.append(f"Changed files vs {base_ref}: {len(changed)}")
-    for f in changed[:60]:
-        lines.append(f"- {f}")
+    lines.extend(
+        (
+            "",
+            f"Diff base: {base_ref} ({base_commit})",
+            "",
+            f"Changed files vs {base_ref}: {len(changed)}",
+        )
+    )
+    lines.extend(f"- {f}" for f in changed[:60])
     if len(changed) > 60:
         lines.append(f"- … (+{len(changed) - 60} more)")
 
     cats = state.categories
-    detected: list[str] = []
-    if cats.get("python_ts"):
-        detected.append("Python/TypeScript")
-    if cats.get("rust"):
-        detected.append("Rust")
-    if cats.get("markdown"):
-        detected.append("Markdown")
+    detected = [
+        label
+        for cat, label in (
+            ("python_ts", "Python/TypeScript"),
+            ("rust", "Rust"),
+            ("markdown", "Markdown"),
+        )
+        if cats.get(cat)
+    ]
     if detected:
-        lines.append("")
-        lines.append("Detected change types: " + ", ".join(detected))
+        lines.extend(("", "Detected change types: " + ", ".join(detected)))
 
     if state.make_targets_requested:
-        lines.append("")
-        lines.append("Requested make targets: " + " ".join(state.make_targets_requested))
+        lines.extend(("", "Requested make targets: " + " ".join(state.make_targets_requested)))
     if state.make_targets_run:
         lines.append("Targets run: " + " ".join(state.make_targets_run))
     if state.make_targets_skipped:
         lines.append("Targets skipped (missing): " + " ".join(state.make_targets_skipped))
 
-    failures = [c for c in state.commands if int(c.get("exit_code", 0)) != 0]
-    for c in failures:
-        cmd = c.get("cmd", "")
-        code = c.get("exit_code", "?")
+    for c in state.commands:
+        if int(c.get("exit_code", 0)) == 0:
+            continue
         combined = "\n".join([x for x in [c.get("stdout", ""), c.get("stderr", "")] if x]).strip()
+        lines.extend(
+            (
+                "",
+                f"Command failed (exit {c.get('exit_code', '?')}): {c.get('cmd', '')}",
+                "```",
+                combined or "(no output captured)",
+                "```",
+            )
+        )
 
-        lines.append("")
-        lines.append(f"Command failed (exit {code}): {cmd}")
-        lines.append("```")
-        lines.append(combined or "(no output captured)")
-        lines.append("```")
-
-    lines.append("")
-    lines.append("Fix the failures above. The checks will re-run at the end of the next turn.")
+    lines.extend(
+        ("", "Fix the failures above. The checks will re-run at the end of the next turn.")
+    )
     return "\n".join(lines)
 
 
@@ -833,6 +1809,33 @@ def targets_for_categories(
     return dedup_preserve_order(requested)
 
 
+# (all, code, Markdown) targets for every combination of category flags, keyed
+# by the flags in CATS_TO_TARGETS order, so each turn does one lookup.
+TARGETS_BY_FLAGS: dict[tuple[bool, ...], tuple[tuple[str, ...], ...]] = {
+    flags: tuple(
+        tuple(targets_for_categories(dict(zip(CATS_TO_TARGETS, flags)), include=include))
+        for include in (None, CODE_CATS, MD_CATS)
+    )
+    for flags in itertools.product((False, True), repeat=len(CATS_TO_TARGETS))
+}
+
+
+def category_flags(categories: dict[str, bool]) -> tuple[bool, ...]:
+    """Key a category mapping into ``TARGETS_BY_FLAGS``.
+
+    Parameters
+    ----------
+    categories
+        Mapping of category flags.
+
+    Returns
+    -------
+    tuple[bool, ...]
+        One flag per category, in ``CATS_TO_TARGETS`` order.
+    """
+    return tuple(bool(categories.get(category)) for category in CATS_TO_TARGETS)
+
+
 def parse_bool_env(value: str) -> bool:
     """Parse a boolean environment value.
 
@@ -870,19 +1873,46 @@ def parse_max_output(value: str, default: int = 12000) -> int:
         return default
 
 
-def parse_env() -> tuple[str, bool, int, bool]:
-    """Parse environment configuration for the hook.
+def parse_fetch_ttl(value: str, default: int = DEFAULT_FETCH_TTL) -> int:
+    """Parse the fetch freshness window.
+
+    Parameters
+    ----------
+    value
+        Raw environment value in seconds.
+    default
+        Default value to use on parse failure.
 
     Returns
     -------
-    tuple[str, bool, int, bool]
-        Base ref, always-fetch flag, max output length, and compush flag.
+    int
+        Parsed fetch TTL in seconds.
     """
-    base_ref = os.environ.get("POST_TURN_BASE_REF", "origin/main")
-    always_fetch = parse_bool_env(os.environ.get("POST_TURN_ALWAYS_FETCH", ""))
-    max_out = parse_max_output(os.environ.get("POST_TURN_MAX_OUTPUT_CHARS", "12000"))
-    compush = parse_bool_env(os.environ.get("POST_TURN_COMPUSH", ""))
-    return base_ref, always_fetch, max_out, compush
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def parse_make_jobs(value: str) -> int | None:
+    """Parse the make job count.
+
+    Parameters
+    ----------
+    value
+        Raw environment value.
+
+    Returns
+    -------
+    int | None
+        The CPU count when unset or invalid, the given count when positive,
+        and None (no ``--jobs`` flag) for zero or less.
+    """
+    try:
+        jobs = int(value)
+    except ValueError:
+        return os.cpu_count() or 2
+    return jobs if jobs > 0 else None
 
 
 def parse_hook_input() -> dict[str, Any]:
@@ -904,6 +1934,72 @@ def parse_hook_input() -> dict[str, Any]:
             return {}
 
 
+def turn_made_edits(hook_input: dict[str, Any]) -> bool | None:
+    """Check the session transcript for tool uses that may have edited files.
+
+    Reads the transcript backwards from its end to the last user prompt.
+
+    Parameters
+    ----------
+    hook_input
+        Parsed hook input.
+
+    Returns
+    -------
+    bool | None
+        True when the turn used any tool outside ``READ_ONLY_TOOLS``, False
+        when it used none, and None when the transcript is missing,
+        unreadable, or the turn start is not within ``TRANSCRIPT_TAIL_BYTES``.
+    """
+    match hook_input.get("transcript_path"):
+        case str() as path if path:
+            pass
+        case _:
+            return None
+    try:
+        with open(path, "rb") as fh:
+            size = fh.seek(0, os.SEEK_END)
+            offset = max(size - TRANSCRIPT_TAIL_BYTES, 0)
+            fh.seek(offset)
+            tail = fh.read()
+    except OSError:
+        return None
+    lines = tail.split(b"\n")
+    if offset:
+        lines = lines[1:]  # Drop the partial first line.
+    for raw in reversed(lines):
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            continue
+        # Injected context and subagent prompts are not the user's prompt.
+        if not isinstance(entry, dict) or entry.get("isMeta"):
+            continue
+        prompt_allowed = not entry.get("isSidechain")
+        match entry:
+            case {"type": "assistant", "message": {"content": list() as blocks}}:
+                if any(
+                    block.get("type") == "tool_use"
+                    and block.get("name") not in READ_ONLY_TOOLS
+                    for block in blocks
+                    if isinstance(block, dict)
+                ):
+                    return True
+            case {"type": "user", "message": {"content": str()}} if prompt_allowed:
+                return False
+            case {"type": "user", "message": {"content": list() as blocks}} if (
+                prompt_allowed
+                and not any(
+                    isinstance(block, dict) and block.get("type") == "tool_result"
+                    for block in blocks
+                )
+            ):
+                return False
+            case _:
+                pass
+    return None
+
+
 def resolve_start_cwd(hook_input: dict[str, Any]) -> Path:
     """Resolve the starting working directory for the hook.
 
@@ -930,6 +2026,23 @@ def resolve_start_cwd(hook_input: dict[str, Any]) -> Path:
             return Path(os.getcwd())
 
 
+def record_merge_base(state: HookState, repo: Path) -> None:
+    """Resolve the merge-base shown in a block report, if not already known.
+
+    The happy path never needs the merge-base commit itself, so it is only
+    computed once a block is certain.
+
+    Parameters
+    ----------
+    state
+        Hook execution state.
+    repo
+        Repository root path.
+    """
+    if state.base_commit is None:
+        state.base_commit, _err = merge_base(repo, state.base_ref)
+
+
 def fail_state(state: HookState, message: str | None) -> int:
     """Mark the state as failed and emit a block response.
 
@@ -950,7 +2063,12 @@ def fail_state(state: HookState, message: str | None) -> int:
     return block_and_print(state)
 
 
-def evaluate_changes(state: HookState, repo: Path, max_out: int) -> int:
+def evaluate_changes(
+    state: HookState,
+    repo: Path,
+    config: HookConfig,
+    make_targets: Callable[[], tuple[set[str] | None, str | None]] | None = None,
+) -> int:
     """Select and execute checks based on detected changes.
 
     Parameters
@@ -959,8 +2077,11 @@ def evaluate_changes(state: HookState, repo: Path, max_out: int) -> int:
         Hook execution state.
     repo
         Repository root path.
-    max_out
-        Maximum number of output characters to capture.
+    config
+        Hook settings; the output budget and make scheduling are read here.
+    make_targets
+        Pending enumeration from ``start_make_targets``; targets are
+        enumerated inline when omitted.
 
     Returns
     -------
@@ -970,32 +2091,42 @@ def evaluate_changes(state: HookState, repo: Path, max_out: int) -> int:
     cats = detect_categories(state.changed_files)
     state.categories = cats
 
-    requested = targets_for_categories(cats)
-    state.make_targets_requested = requested
+    requested, code_requested, md_requested = TARGETS_BY_FLAGS[category_flags(cats)]
+    state.make_targets_requested = list(requested)
     if not requested:
         return 0
 
-    make_targets, make_err = get_make_targets(repo)
     if make_targets is None:
+        available, make_err = get_make_targets(repo)
+    else:
+        available, make_err = make_targets()
+    if available is None:
+        record_merge_base(state, repo)
         return fail_state(state, f"Could not enumerate make targets: {make_err}")
 
-    run_targets = [t for t in requested if t in make_targets]
-    skip_targets = [t for t in requested if t not in make_targets]
+    run_targets = [t for t in requested if t in available]
+    skip_targets = [t for t in requested if t not in available]
     state.make_targets_run = run_targets
     state.make_targets_skipped = skip_targets
 
-    commands: list[dict[str, Any]] = []
-    code_targets = [
-        t for t in targets_for_categories(cats, include=CODE_CATS) if t in make_targets
-    ]
-    md_targets = [
-        t for t in targets_for_categories(cats, include=MD_CATS) if t in make_targets
-    ]
-
-    if code_targets:
-        commands.append(run_make(repo, "code", code_targets, max_out))
-    if md_targets:
-        commands.append(run_make(repo, "markdown", md_targets, max_out))
+    code_targets = [t for t in code_requested if t in available]
+    md_targets = [t for t in md_requested if t in available]
+
+    if config.split_groups:
+        buckets = [
+            (kind, targets)
+            for kind, targets in (("code", code_targets), ("markdown", md_targets))
+            if targets
+        ]
+    elif run_targets:
+        # One make parses the makefile once; --jobs still overlaps the groups.
+        kind = "all" if code_targets and md_targets else "code" if code_targets else "markdown"
+        buckets = [(kind, run_targets)]
+    else:
+        buckets = []
+    commands = run_make_buckets(
+        repo, buckets, config.max_out, serial=config.serial, jobs=config.make_jobs
+    )
 
     state.commands = commands
 
@@ -1007,22 +2138,19 @@ def evaluate_changes(state: HookState, repo: Path, max_out: int) -> int:
         return 0
 
     state.ok = False
+    record_merge_base(state, repo)
     return block_and_print(state)
 
 
-def prepare_run_stop_checks(
-    start_cwd: Path, base_ref: str, *, always_fetch: bool
-) -> RunStopChecksPreparation:
+def prepare_run_stop_checks(start_cwd: Path, config: HookConfig) -> RunStopChecksPreparation:
     """Prepare repository state for ``run_stop_checks``.
 
     Parameters
     ----------
     start_cwd
         Working directory for git operations.
-    base_ref
-        Base git ref used for comparisons.
-    always_fetch
-        Whether to always fetch the base ref.
+    config
+        Hook settings; the base ref and fetch policy are read here.
 
     Returns
     -------
@@ -1030,9 +2158,9 @@ def prepare_run_stop_checks(
         Structured preparation result containing the populated hook state and
         repository root when preparation succeeded.
     """
-    state = HookState(base_ref=base_ref)
+    state = HookState(base_ref=config.base_ref)
 
-    if shutil.which("git") is None:
+    if tool_path("git") is None:
         return RunStopChecksPreparation(
             ok=False,
             exit_code=fail_state(state, "git not found on PATH"),
@@ -1043,7 +2171,9 @@ def prepare_run_stop_checks(
     if repo is None:
         return RunStopChecksPreparation(ok=False, exit_code=0, state=state)
 
-    ok, err, fetched = ensure_base_ref(repo, base_ref, always_fetch=always_fetch)
+    ok, err, fetched = ensure_base_ref(
+        repo, config.base_ref, always_fetch=config.always_fetch, fetch_ttl=config.fetch_ttl
+    )
     state.fetched = fetched
     if not ok:
         return RunStopChecksPreparation(
@@ -1052,17 +2182,13 @@ def prepare_run_stop_checks(
             state=state,
         )
 
-    base_commit, err = merge_base(repo, base_ref)
-    if base_commit is None:
-        return RunStopChecksPreparation(
-            ok=False,
-            exit_code=fail_state(state, err),
-            state=state,
-        )
-    state.base_commit = base_commit
+    # A makefile's targets are enumerated while git lists the changed files;
+    # without one there is nothing to enumerate.
+    make_targets = start_make_targets(repo) if makefile_cache_key(repo) else None
 
-    files, err = changed_files(repo, base_commit)
+    files, err = changed_files(repo, config.base_ref)
     if files is None:
+        record_merge_base(state, repo)
         return RunStopChecksPreparation(
             ok=False,
             exit_code=fail_state(state, err),
@@ -1070,7 +2196,9 @@ def prepare_run_stop_checks(
         )
 
     state.changed_files = files
-    return RunStopChecksPreparation(ok=True, exit_code=0, state=state, repo=repo)
+    return RunStopChecksPreparation(
+        ok=True, exit_code=0, state=state, repo=repo, make_targets=make_targets
+    )
 
 
 def compush_check(repo: Path) -> int:
@@ -1115,37 +2243,22 @@ def compush_check(repo: Path) -> int:
     return 0
 
 
-def run_stop_checks(
-    start_cwd: Path,
-    base_ref: str,
-    *,
-    always_fetch: bool,
-    max_out: int,
-    compush: bool = False,
-) -> int:
+def run_stop_checks(start_cwd: Path, config: HookConfig) -> int:
     """Run stop-hook checks for a given working directory.
 
     Parameters
     ----------
     start_cwd
         Working directory for git operations.
-    base_ref
-        Base git ref used for comparisons.
-    always_fetch
-        Whether to always fetch origin/main.
-    max_out
-        Maximum number of output characters to capture.
-    compush
-        Whether to remind the agent to commit and push when dirty.
+    config
+        Hook settings.
 
     Returns
     -------
     int
         Exit code for the hook.
     """
-    preparation = prepare_run_stop_checks(
-        start_cwd, base_ref, always_fetch=always_fetch
-    )
+    preparation = prepare_run_stop_checks(start_cwd, config)
     if not preparation.ok:
         return preparation.exit_code
 
@@ -1154,11 +2267,11 @@ def run_stop_checks(
     assert repo is not None
 
     if state.changed_files:
-        rc = evaluate_changes(state, repo, max_out)
+        rc = evaluate_changes(state, repo, config, preparation.make_targets)
         if rc != 0:
             return rc
 
-    if compush:
+    if config.compush:
         return compush_check(repo)
 
     return 0
@@ -1173,15 +2286,14 @@ def main() -> int:
         Exit code for the hook.
     """
     hook_input = parse_hook_input()
-    start_cwd = resolve_start_cwd(hook_input)
-    base_ref, always_fetch, max_out, compush = parse_env()
-    return run_stop_checks(
-        start_cwd,
-        base_ref,
-        always_fetch=always_fetch,
-        max_out=max_out,
-        compush=compush,
-    )
+    config = HookConfig.from_env()
+    if (
+        config.skip_if_no_edits
+        and not hook_input.get("stop_hook_active")
+        and turn_made_edits(hook_input) is False
+    ):
+        return 0
+    return run_stop_checks(resolve_start_cwd(hook_input), config)
 
 
 if __name__ == "__main__":
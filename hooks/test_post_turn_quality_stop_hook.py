@@ -20,8 +20,11 @@ from __future__ import annotations
 
 import importlib.util
 import json
+import os
 import subprocess
 import sys
+import threading
+from collections.abc import Iterator
 from pathlib import Path
 from types import ModuleType
 from unittest.mock import patch
@@ -49,6 +52,14 @@ def _load_hook_module() -> ModuleType:
 hook = _load_hook_module()
 
 
+@pytest.fixture(autouse=True)
+def _fresh_tool_paths() -> Iterator[None]:
+    """Forget executables resolved by earlier tests so PATH patches apply."""
+    hook.tool_path.cache_clear()
+    yield
+    hook.tool_path.cache_clear()
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -63,9 +74,234 @@ def _completed(
     )
 
 
+def _completed_bytes(
+    returncode: int, stdout: bytes = b"", stderr: bytes = b""
+) -> subprocess.CompletedProcess[bytes]:
+    """Build an undecoded ``CompletedProcess`` stub, as ``run_bytes`` returns."""
+    return subprocess.CompletedProcess(
+        args=["unit-test"], returncode=returncode, stdout=stdout, stderr=stderr
+    )
+
+
 REPO = Path("/fake/repo")
 
 
+# ---------------------------------------------------------------------------
+# ensure_origin_main
+# ---------------------------------------------------------------------------
+
+
+class TestEnsureOriginMain:
+    """Tests for ensure_origin_main()."""
+
+    def test_existing_ref_needs_one_git_call(self) -> None:
+        """A present origin/main is confirmed by a single for-each-ref."""
+        with patch.object(
+            hook, "run", return_value=_completed(0, stdout="refs/remotes/origin/main\n")
+        ) as mock_run:
+            ok, err, fetched = hook.ensure_origin_main(REPO, always_fetch=False)
+        assert (ok, err, fetched) == (True, None, False), (
+            f"expected origin/main found without fetch but got {(ok, err, fetched)!r}"
+        )
+        assert mock_run.call_count == 1, (
+            f"expected one git call but got {mock_run.call_count}"
+        )
+        assert "for-each-ref" in mock_run.call_args.args[0], (
+            f"expected for-each-ref but got {mock_run.call_args.args[0]!r}"
+        )
+
+    def test_missing_ref_without_origin_remote(self) -> None:
+        """The remote is only checked, and reported, when a fetch is needed."""
+        with patch.object(hook, "run") as mock_run, \
+             patch.object(hook, "fetch_origin_main") as mock_fetch:
+            mock_run.side_effect = [
+                _completed(0),  # for-each-ref: no ref
+                _completed(0, stdout="upstream\n"),  # git remote
+            ]
+            ok, err, fetched = hook.ensure_origin_main(REPO, always_fetch=False)
+        assert (ok, err, fetched) == (False, "git remote 'origin' not found", False), (
+            f"expected missing-origin error but got {(ok, err, fetched)!r}"
+        )
+        mock_fetch.assert_not_called()
+
+    def test_ref_exists_ignores_nested_refs(self) -> None:
+        """for-each-ref prefix matches below the ref do not count."""
+        with patch.object(
+            hook, "run", return_value=_completed(0, stdout="refs/remotes/origin/main/x\n")
+        ):
+            exists, err = hook.ref_exists(REPO, "refs/remotes/origin/main")
+        assert (exists, err) == (False, None), (
+            f"expected nested ref to be ignored but got {(exists, err)!r}"
+        )
+
+
+# ---------------------------------------------------------------------------
+# merge_base
+# ---------------------------------------------------------------------------
+
+
+class TestMergeBase:
+    """Tests for merge_base()."""
+
+    def test_ancestor_base_is_its_own_merge_base(self) -> None:
+        """HEAD descending from the base skips the full merge-base walk."""
+        with patch.object(hook, "run_status", return_value=0), \
+             patch.object(hook, "run") as mock_run:
+            mock_run.side_effect = [
+                _completed(0, stdout="abc123\n"),  # rev-parse base^{commit}
+            ]
+            base, err = hook.merge_base(REPO, "origin/main")
+        assert base == "abc123", f"expected base tip as merge-base but got {base!r}"
+        assert err is None, f"expected no error but got {err!r}"
+        assert mock_run.call_count == 1, (
+            f"expected no full merge-base call but got {mock_run.call_count} runs"
+        )
+
+    def test_diverged_history_falls_back(self) -> None:
+        """A base that is not an ancestor uses git merge-base."""
+        with patch.object(hook, "run_status", return_value=1), \
+             patch.object(hook, "run") as mock_run:
+            mock_run.side_effect = [
+                _completed(0, stdout="def456\n"),  # merge-base
+            ]
+            base, err = hook.merge_base(REPO, "origin/main")
+        assert base == "def456", f"expected computed merge-base but got {base!r}"
+        assert err is None, f"expected no error but got {err!r}"
+        cmd = mock_run.call_args.args[0]
+        assert "--all" not in cmd, f"expected a single merge-base but got {cmd!r}"
+
+
+# ---------------------------------------------------------------------------
+# changed_files
+# ---------------------------------------------------------------------------
+
+
+class TestChangedFiles:
+    """Tests for changed_files()."""
+
+    def test_unions_diff_and_status(self) -> None:
+        """Diff and porcelain status entries merge into one sorted list."""
+        outputs = {
+            "diff-tree": _completed_bytes(0, stdout=b"src/a.py\0docs/with space.md\0"),
+            "status": _completed_bytes(0, stdout=b" M src/a.py\0A  lib.rs\0?? new/dir/b.ts\0"),
+        }
+        with patch.object(hook, "run_bytes", side_effect=lambda cmd, _cwd: outputs[cmd[2]]) as mock_run:
+            files, err = hook.changed_files(REPO, "origin/main")
+        assert files == ["docs/with space.md", "lib.rs", "new/dir/b.ts", "src/a.py"], (
+            f"expected merged changed files but got {files!r}"
+        )
+        assert err is None, f"expected no error but got {err!r}"
+        cmds = {call.args[0][2]: call.args[0] for call in mock_run.call_args_list}
+        diff_cmd = cmds["diff-tree"]
+        assert diff_cmd[2:8] == ["diff-tree", "-r", "-z", "--name-only", "--merge-base", "origin/main"], (
+            f"expected a merge-base tree diff against HEAD but got {diff_cmd!r}"
+        )
+        status_cmd = cmds["status"]
+        assert "--ignore-submodules=all" in status_cmd, (
+            f"expected submodules to be skipped but got {status_cmd!r}"
+        )
+        for call in mock_run.call_args_list:
+            cmd = call.args[0]
+            assert cmd[-len(hook.CHANGE_PATHSPECS) - 1 :] == ["--", *hook.CHANGE_PATHSPECS], (
+                f"expected extension pathspecs on {cmd!r}"
+            )
+
+    def test_undecodable_path_survives(self) -> None:
+        """Paths that are not valid UTF-8 are decoded losslessly."""
+        outputs = {
+            "diff-tree": _completed_bytes(0, stdout=b""),
+            "status": _completed_bytes(0, stdout=b"?? caf\xe9.md\0"),
+        }
+        with patch.object(hook, "run_bytes", side_effect=lambda cmd, _cwd: outputs[cmd[2]]):
+            files, err = hook.changed_files(REPO, "origin/main")
+        assert files == [os.fsdecode(b"caf\xe9.md")], (
+            f"expected the raw path round-tripped via fsdecode but got {files!r}"
+        )
+        assert err is None, f"expected no error but got {err!r}"
+
+    def test_status_error(self) -> None:
+        """A failing git status surfaces as an error."""
+        outputs = {
+            "diff-tree": _completed_bytes(0, stdout=b""),
+            "status": _completed_bytes(128, stderr=b"fatal: index corrupt"),
+        }
+        with patch.object(hook, "run_bytes", side_effect=lambda cmd, _cwd: outputs[cmd[2]]):
+            files, err = hook.changed_files(REPO, "origin/main")
+        assert files is None, f"expected no files on error but got {files!r}"
+        assert "fatal: index corrupt" in (err or ""), (
+            f"expected status failure in message but got {err!r}"
+        )
+
+    def test_status_overlaps_diff(self) -> None:
+        """git status starts before diff-tree finishes."""
+        status_started = threading.Event()
+
+        def fake_run_bytes(cmd: list[str], _cwd: Path) -> subprocess.CompletedProcess[bytes]:
+            if cmd[2] == "status":
+                status_started.set()
+                return _completed_bytes(0, stdout=b"")
+            assert status_started.wait(timeout=5), "expected git status to run alongside diff-tree"
+            return _completed_bytes(0, stdout=b"a.py\0")
+
+        with patch.object(hook, "run_bytes", side_effect=fake_run_bytes):
+            files, err = hook.changed_files(REPO, "origin/main")
+        assert files == ["a.py"], f"expected the diff-tree entry but got {files!r}"
+        assert err is None, f"expected no error but got {err!r}"
+
+
+class TestFindRepoRoot:
+    """Tests for find_repo_root() and its use in repo_root()."""
+
+    @pytest.fixture(autouse=True)
+    def _plain_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        for var in hook.GIT_DISCOVERY_ENV_VARS:
+            monkeypatch.delenv(var, raising=False)
+
+    def _repo(self, tmp_path: Path) -> Path:
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "HEAD").write_text("ref: refs/heads/main\n", encoding="utf-8")
+        (tmp_path / "src" / "pkg").mkdir(parents=True)
+        return tmp_path.resolve()
+
+    def test_walks_up_to_git_dir(self, tmp_path: Path) -> None:
+        """A subdirectory resolves to the directory holding .git."""
+        repo = self._repo(tmp_path)
+        found = hook.find_repo_root(repo / "src" / "pkg")
+        assert found == repo, f"expected {repo} but got {found!r}"
+
+    def test_worktree_pointer_file(self, tmp_path: Path) -> None:
+        """A .git file pointing at a git directory counts as a repository."""
+        gdir = tmp_path / "main.git" / "worktrees" / "wt"
+        gdir.mkdir(parents=True)
+        (gdir / "HEAD").write_text("ref: refs/heads/wt\n", encoding="utf-8")
+        wt = tmp_path / "wt"
+        wt.mkdir()
+        (wt / ".git").write_text(f"gitdir: {gdir}\n", encoding="utf-8")
+        found = hook.find_repo_root(wt)
+        assert found == wt.resolve(), f"expected {wt} but got {found!r}"
+
+    def test_defers_to_git(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Discovery overrides, git directories and no .git all defer to git."""
+        repo = self._repo(tmp_path)
+        inside = hook.find_repo_root(repo / ".git")
+        assert inside is None, f"expected no answer inside .git but got {inside!r}"
+        stray = tmp_path / "src" / ".git"
+        stray.mkdir()
+        broken = hook.find_repo_root(repo / "src" / "pkg")
+        assert broken is None, f"expected a .git without HEAD to defer but got {broken!r}"
+        monkeypatch.setenv("GIT_DIR", str(repo / ".git"))
+        overridden = hook.find_repo_root(repo)
+        assert overridden is None, f"expected GIT_DIR to defer to git but got {overridden!r}"
+
+    def test_repo_root_skips_git_when_found(self, tmp_path: Path) -> None:
+        """repo_root only spawns git when the walk has no answer."""
+        repo = self._repo(tmp_path)
+        with patch.object(hook, "run_git") as mock_run_git:
+            root, err = hook.repo_root(repo / "src")
+        assert (root, err) == (repo, None), f"expected {repo} but got {(root, err)!r}"
+        mock_run_git.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # has_uncommitted_changes
 # ---------------------------------------------------------------------------
@@ -333,28 +569,39 @@ class TestCompushCheck:
 
 
 # ---------------------------------------------------------------------------
-# parse_env - compush flag
+# HookConfig - compush flag
 # ---------------------------------------------------------------------------
 
 
-class TestParseEnvCompush:
-    """Tests for the compush flag in parse_env()."""
+class TestHookConfigCompush:
+    """Tests for the compush flag in HookConfig.from_env()."""
 
     def test_compush_set(self, monkeypatch: pytest.MonkeyPatch) -> None:
         monkeypatch.setenv("POST_TURN_COMPUSH", "1")
-        _base, _fetch, _max, compush = hook.parse_env()
+        compush = hook.HookConfig.from_env().compush
         assert compush is True, f"expected compush to be True but was {compush!r}"
 
     def test_compush_unset(self, monkeypatch: pytest.MonkeyPatch) -> None:
         monkeypatch.delenv("POST_TURN_COMPUSH", raising=False)
-        _base, _fetch, _max, compush = hook.parse_env()
+        compush = hook.HookConfig.from_env().compush
         assert compush is False, f"expected compush to be False but was {compush!r}"
 
     def test_compush_truthy_alias(self, monkeypatch: pytest.MonkeyPatch) -> None:
         monkeypatch.setenv("POST_TURN_COMPUSH", "yes")
-        _base, _fetch, _max, compush = hook.parse_env()
+        compush = hook.HookConfig.from_env().compush
+        assert compush is True, f"expected compush to be True but was {compush!r}"
+
+    def test_compush_on_alias(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("POST_TURN_COMPUSH", " On ")
+        compush = hook.HookConfig.from_env().compush
         assert compush is True, f"expected compush to be True but was {compush!r}"
 
+    def test_config_is_frozen(self) -> None:
+        """Settings cannot change once read."""
+        config = hook.HookConfig.from_env()
+        with pytest.raises(AttributeError):
+            config.compush = True  # type: ignore[misc]
+
 
 # ---------------------------------------------------------------------------
 # run_stop_checks - compush integration
@@ -373,9 +620,7 @@ class TestRunStopChecksCompush:
              patch.object(hook, "evaluate_changes", return_value=0), \
              patch.object(hook, "compush_check", return_value=0) as mock_compush, \
              patch("shutil.which", return_value="/usr/bin/git"):
-            rc = hook.run_stop_checks(
-                REPO, "origin/main", always_fetch=False, max_out=12000, compush=True
-            )
+            rc = hook.run_stop_checks(REPO, hook.HookConfig(compush=True))
         assert rc == 0, f"expected run_stop_checks rc 0 but got {rc!r}"
         mock_compush.assert_called_once_with(REPO)
 
@@ -388,9 +633,7 @@ class TestRunStopChecksCompush:
              patch.object(hook, "evaluate_changes", return_value=0), \
              patch.object(hook, "compush_check") as mock_compush, \
              patch("shutil.which", return_value="/usr/bin/git"):
-            hook.run_stop_checks(
-                REPO, "origin/main", always_fetch=False, max_out=12000, compush=False
-            )
+            hook.run_stop_checks(REPO, hook.HookConfig(compush=False))
         mock_compush.assert_not_called()
 
     def test_compush_skipped_on_quality_failure(self) -> None:
@@ -402,9 +645,7 @@ class TestRunStopChecksCompush:
              patch.object(hook, "evaluate_changes", return_value=1), \
              patch.object(hook, "compush_check") as mock_compush, \
              patch("shutil.which", return_value="/usr/bin/git"):
-            hook.run_stop_checks(
-                REPO, "origin/main", always_fetch=False, max_out=12000, compush=True
-            )
+            hook.run_stop_checks(REPO, hook.HookConfig(compush=True))
         mock_compush.assert_not_called()
 
     def test_compush_runs_when_no_files_changed(self) -> None:
@@ -416,9 +657,7 @@ class TestRunStopChecksCompush:
              patch.object(hook, "evaluate_changes") as mock_evaluate, \
              patch.object(hook, "compush_check", return_value=0) as mock_compush, \
              patch("shutil.which", return_value="/usr/bin/git"):
-            rc = hook.run_stop_checks(
-                REPO, "origin/main", always_fetch=False, max_out=12000, compush=True
-            )
+            rc = hook.run_stop_checks(REPO, hook.HookConfig(compush=True))
         assert rc == 0, f"expected run_stop_checks rc 0 but got {rc!r}"
         mock_evaluate.assert_not_called()
         mock_compush.assert_called_once_with(REPO)
@@ -446,32 +685,734 @@ class TestRunOSError:
     def test_run_stop_checks_nonexistent_cwd(self, capsys: pytest.CaptureFixture[str]) -> None:
         """Full pipeline exits cleanly when start_cwd does not exist."""
         with patch("shutil.which", return_value="/usr/bin/git"):
-            rc = hook.run_stop_checks(
-                Path("/nonexistent/path"),
-                "origin/main",
-                always_fetch=False,
-                max_out=12000,
-            )
+            rc = hook.run_stop_checks(Path("/nonexistent/path"), hook.HookConfig())
         assert rc == 0, f"expected run_stop_checks rc 0 but got {rc!r}"
         assert capsys.readouterr().out == "", (
             "expected no hook output when start_cwd does not exist"
         )
 
 
+class TestDetectCategories:
+    """Tests for detect_categories()."""
+
+    def test_classifies_by_case_insensitive_suffix(self) -> None:
+        """Each known extension maps to its category regardless of case."""
+        cats = hook.detect_categories(["src/App.TSX", "crate/lib.rs", "README.Md"])
+        assert cats == {"python_ts": True, "rust": True, "markdown": True}, (
+            f"expected every category detected but got {cats!r}"
+        )
+
+    def test_ignores_dotfiles_and_directory_dots(self) -> None:
+        """Dots outside the final component or leading a name are not suffixes."""
+        cats = hook.detect_categories([".md", "docs.md/notes", "pkg/.py", "setup.cfg"])
+        assert cats == hook.default_categories(), (
+            f"expected no categories detected but got {cats!r}"
+        )
+
+    def test_stops_once_every_category_fired(self) -> None:
+        """Files after the last new category are never inspected."""
+        files = ["a.py", "b.rs", "c.md", None]
+        cats = hook.detect_categories(files)  # type: ignore[arg-type]
+        assert all(cats.values()), f"expected every category detected but got {cats!r}"
+
+
+class TestParseMakeTargets:
+    """Tests for parse_make_targets()."""
+
+    def test_extracts_rule_targets(self) -> None:
+        """Rule lines yield targets; variables, comments, recipes and patterns do not."""
+        database = "\n".join(
+            [
+                "# Variables",
+                "PYTEST = uv run pytest",
+                "PATH = /usr/bin:/bin",
+                "CURDIR := /fake/repo",
+                "SHELLFLAGS ::= -c",
+                "# Files",
+                "lint: syntax-check shell-syntax-check",
+                "\t@echo lint",
+                "check-fmt typecheck:",
+                "%.o: %.c",
+                "all:: ci",
+                "",
+            ]
+        )
+        targets = hook.parse_make_targets(database)
+        assert targets == {"lint", "check-fmt", "typecheck", "all"}, (
+            f"expected rule targets only but got {targets!r}"
+        )
+
+    def test_skips_prerequisite_only_files(self) -> None:
+        """Entries make marks "Not a target" are not rule targets."""
+        database = "\n".join(
+            [
+                "# Files",
+                "",
+                "# Not a target:",
+                "Makefile:",
+                "#  Implicit rule search has been done.",
+                "",
+                "lint: fmt",
+                "",
+            ]
+        )
+        targets = hook.parse_make_targets(database)
+        assert targets == {"lint"}, f"expected only the rule target but got {targets!r}"
+
+    def test_database_files_section(self) -> None:
+        """Only the Files section of a make -p dump is parsed."""
+        dump = "# Variables\nX := a:b\n\n# Files\nlint:\n\n# VPATH Search Paths\nnot-me:\n"
+        section = hook.database_files_section(dump)
+        assert section == "\n# Files\nlint:\n", f"expected the Files section but got {section!r}"
+
+
+class TestRunGit:
+    """Tests for run_git()."""
+
+    def test_skips_optional_locks(self) -> None:
+        """Read-only git calls never take optional locks."""
+        with patch.object(hook, "run", return_value=_completed(0)) as mock_run:
+            hook.run_git(["status", "--porcelain"], REPO)
+        mock_run.assert_called_once_with(
+            [hook.tool_cmd("git"), "--no-optional-locks", "status", "--porcelain"], REPO
+        )
+
+
+class TestRunStatus:
+    """Tests for run_status()."""
+
+    def test_returns_exit_code_without_pipes(self) -> None:
+        """Output is discarded rather than captured."""
+        with patch.object(
+            hook.subprocess, "run", return_value=_completed(3)
+        ) as mock_run:
+            rc = hook.run_status(["git", "show-ref"], REPO)
+        assert rc == 3, f"expected the child's exit code but got {rc!r}"
+        kwargs = mock_run.call_args.kwargs
+        assert kwargs["stdout"] is kwargs["stderr"] is hook.subprocess.DEVNULL, (
+            f"expected output sent to DEVNULL but got {kwargs!r}"
+        )
+
+    def test_missing_cwd_is_failure(self, tmp_path: Path) -> None:
+        """An unusable working directory reports exit code 1."""
+        rc = hook.run_status(["git", "status"], tmp_path / "gone")
+        assert rc == 1, f"expected exit code 1 for a missing cwd but got {rc!r}"
+
+
+class TestToolPath:
+    """Tests for tool_path()."""
+
+    def test_env_override_replaces_path_search(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """POST_TURN_GIT pins git instead of searching PATH for it."""
+        git = tmp_path / "git"
+        git.write_text("#!/bin/sh\n", encoding="utf-8")
+        git.chmod(0o755)
+        monkeypatch.setenv("POST_TURN_GIT", str(git))
+        monkeypatch.setenv("PATH", "")
+        path = hook.tool_path("git")
+        assert path == str(git), f"expected pinned git but got {path!r}"
+
+    def test_bogus_override_blocks(
+        self, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """An override naming no executable blocks like a missing git."""
+        monkeypatch.setenv("POST_TURN_GIT", "/nonexistent/git")
+        rc = hook.run_stop_checks(REPO, hook.HookConfig())
+        assert rc == 0, f"expected run_stop_checks rc 0 but got {rc!r}"
+        reason = json.loads(capsys.readouterr().out)["reason"]
+        assert "git not found on PATH" in reason, (
+            f"expected missing-git reason but got {reason!r}"
+        )
+
+    def test_lookup_happens_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """PATH is searched once per run however many commands spawn."""
+        monkeypatch.delenv("POST_TURN_MAKE", raising=False)
+        with patch("shutil.which", return_value="/usr/bin/make") as mock_which:
+            first = hook.tool_cmd("make")
+            second = hook.tool_cmd("make")
+        assert first == second == "/usr/bin/make", (
+            f"expected resolved make path but got {first!r} and {second!r}"
+        )
+        mock_which.assert_called_once_with("make")
+
+    def test_missing_git_blocks(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """No git on PATH blocks with an explanation."""
+        with patch("shutil.which", return_value=None):
+            rc = hook.run_stop_checks(REPO, hook.HookConfig())
+        assert rc == 0, f"expected run_stop_checks rc 0 but got {rc!r}"
+        reason = json.loads(capsys.readouterr().out)["reason"]
+        assert "git not found on PATH" in reason, (
+            f"expected missing-git reason but got {reason!r}"
+        )
+
+
 class TestGetMakeTargets:
     """Tests for make target enumeration."""
 
-    def test_missing_make_returns_error(self) -> None:
+    def _repo(self, tmp_path: Path) -> Path:
+        # An include keeps the direct scan out of the way so make runs.
+        (tmp_path / "Makefile").write_text("-include local.mk\nlint:\n", encoding="utf-8")
+        return tmp_path
+
+    def test_missing_make_returns_error(self, tmp_path: Path) -> None:
         """Missing `make` surfaces as an enumeration error."""
         with patch.object(
             hook,
             "run",
             side_effect=FileNotFoundError(2, "No such file or directory", "make"),
         ):
-            targets, err = hook.get_make_targets(REPO)
+            targets, err = hook.get_make_targets(self._repo(tmp_path))
         assert targets is None, (
             f"expected no make targets when make is missing but got {targets!r}"
         )
         assert err == "make not found on PATH", (
             f"expected make-not-found error but got {err!r}"
         )
+
+    def test_database_dump_skips_builtins(self, tmp_path: Path) -> None:
+        """make -qp runs without built-in rules and variables."""
+        database = f"lint:\n{hook.MAKE_PROBE_GOAL}:\n"
+        with patch.object(hook, "run", return_value=_completed(1, stdout=database)) as mock_run:
+            targets, err = hook.get_make_targets(self._repo(tmp_path))
+        cmd = mock_run.call_args.args[0]
+        assert "--no-builtin-rules" in cmd and "--no-builtin-variables" in cmd, (
+            f"expected built-ins to be suppressed but got {cmd!r}"
+        )
+        assert cmd[-1] == hook.MAKE_PROBE_GOAL, (
+            f"expected the no-op probe goal instead of the default goal but got {cmd!r}"
+        )
+        assert targets == {"lint"}, f"expected lint target but got {targets!r}"
+        assert err is None, f"expected no error but got {err!r}"
+
+    def test_make_without_eval_falls_back(self, tmp_path: Path) -> None:
+        """A make that rejects --eval dumps the database without the probe."""
+        rejected = _completed(2, stderr="make: unrecognized option `--eval=.x: ; @:'\n")
+        with patch.object(
+            hook, "run", side_effect=[rejected, _completed(0, stdout="lint:\n")]
+        ) as mock_run:
+            targets, err = hook.get_make_targets(self._repo(tmp_path))
+        assert (targets, err) == ({"lint"}, None), (
+            f"expected targets from the plain dump but got {(targets, err)!r}"
+        )
+        cmd = mock_run.call_args.args[0]
+        assert not any(arg.startswith("--eval") for arg in cmd), (
+            f"expected the retry to drop --eval but got {cmd!r}"
+        )
+        assert hook.MAKE_PROBE_GOAL not in cmd, (
+            f"expected the retry to drop the probe goal but got {cmd!r}"
+        )
+
+    def test_missing_makefile_is_no_targets(self, tmp_path: Path) -> None:
+        """A repository without a makefile has no targets and never runs make."""
+        with patch.object(hook, "run") as mock_run:
+            targets, err = hook.get_make_targets(tmp_path)
+        assert targets == set(), f"expected no targets but got {targets!r}"
+        assert err is None, f"expected no error but got {err!r}"
+        mock_run.assert_not_called()
+
+
+class TestTargetsByFlags:
+    """Tests for the precomputed TARGETS_BY_FLAGS table."""
+
+    def test_table_matches_expansion(self) -> None:
+        """Every flag combination matches targets_for_categories."""
+        for flags, (all_targets, code, md) in hook.TARGETS_BY_FLAGS.items():
+            cats = dict(zip(hook.CATS_TO_TARGETS, flags))
+            assert list(all_targets) == hook.targets_for_categories(cats), (
+                f"expected all targets for {cats!r} but got {all_targets!r}"
+            )
+            assert list(code) == hook.targets_for_categories(cats, include=hook.CODE_CATS), (
+                f"expected code targets for {cats!r} but got {code!r}"
+            )
+            assert list(md) == hook.targets_for_categories(cats, include=hook.MD_CATS), (
+                f"expected Markdown targets for {cats!r} but got {md!r}"
+            )
+        assert len(hook.TARGETS_BY_FLAGS) == 2 ** len(hook.CATS_TO_TARGETS), (
+            f"expected every flag combination but got {len(hook.TARGETS_BY_FLAGS)}"
+        )
+
+
+class TestEvaluateChanges:
+    """Tests for make bucket dispatch in evaluate_changes()."""
+
+    def test_all_targets_share_one_make(self) -> None:
+        """By default code and Markdown targets go to a single make process."""
+        state = hook.HookState(changed_files=["src/foo.py", "README.md"])
+        with patch.object(
+            hook, "get_make_targets", return_value=({"lint", "markdownlint"}, None)
+        ), patch.object(
+            hook, "run_make", return_value={"kind": "all", "exit_code": 0}
+        ) as mock_run_make:
+            rc = hook.evaluate_changes(state, REPO, hook.HookConfig(make_jobs=4))
+        assert rc == 0, f"expected evaluate_changes rc 0 but got {rc!r}"
+        mock_run_make.assert_called_once_with(REPO, "all", ["lint", "markdownlint"], 12000, 4)
+
+    def test_code_and_markdown_buckets_run_concurrently(self) -> None:
+        """Split buckets run at once and results keep code-then-markdown order."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_run_make(
+            _repo: Path, kind: str, targets: list[str], _max_out: int, _jobs: int | None
+        ) -> dict[str, object]:
+            barrier.wait()
+            return {"kind": kind, "cmd": "make " + " ".join(targets), "exit_code": 0}
+
+        state = hook.HookState(changed_files=["src/foo.py", "README.md"])
+        with patch.object(
+            hook,
+            "get_make_targets",
+            return_value=({"check-fmt", "lint", "markdownlint"}, None),
+        ), patch.object(hook, "run_make", side_effect=fake_run_make):
+            rc = hook.evaluate_changes(state, REPO, hook.HookConfig(split_groups=True))
+        assert rc == 0, f"expected evaluate_changes rc 0 but got {rc!r}"
+        kinds = [c["kind"] for c in state.commands]
+        assert kinds == ["code", "markdown"], (
+            f"expected code then markdown commands but got {kinds!r}"
+        )
+
+    def test_single_bucket_runs_inline(self) -> None:
+        """A lone bucket does not need a worker pool."""
+        state = hook.HookState(changed_files=["README.md"])
+        with patch.object(
+            hook, "get_make_targets", return_value=({"markdownlint"}, None)
+        ), patch.object(
+            hook, "run_make", return_value={"kind": "markdown", "exit_code": 0}
+        ) as mock_run_make, patch("concurrent.futures.ThreadPoolExecutor") as mock_pool:
+            rc = hook.evaluate_changes(state, REPO, hook.HookConfig())
+        assert rc == 0, f"expected evaluate_changes rc 0 but got {rc!r}"
+        mock_run_make.assert_called_once_with(REPO, "markdown", ["markdownlint"], 12000, None)
+        mock_pool.assert_not_called()
+
+    def test_serial_runs_buckets_in_order(self) -> None:
+        """POST_TURN_SERIAL runs both buckets without a worker pool."""
+        state = hook.HookState(changed_files=["src/foo.py", "README.md"])
+        with patch.object(
+            hook, "get_make_targets", return_value=({"lint", "markdownlint"}, None)
+        ), patch.object(
+            hook,
+            "run_make",
+            side_effect=lambda _r, kind, _t, _m, _j: {"kind": kind, "exit_code": 0},
+        ), patch("concurrent.futures.ThreadPoolExecutor") as mock_pool:
+            rc = hook.evaluate_changes(
+                state, REPO, hook.HookConfig(serial=True, split_groups=True)
+            )
+        assert rc == 0, f"expected evaluate_changes rc 0 but got {rc!r}"
+        mock_pool.assert_not_called()
+        kinds = [c["kind"] for c in state.commands]
+        assert kinds == ["code", "markdown"], f"expected both buckets in order but got {kinds!r}"
+
+    def test_success_skips_merge_base(self) -> None:
+        """Passing checks never resolve the merge-base."""
+        state = hook.HookState(changed_files=["README.md"])
+        with patch.object(
+            hook, "get_make_targets", return_value=({"markdownlint"}, None)
+        ), patch.object(
+            hook, "run_make", return_value={"kind": "markdown", "exit_code": 0}
+        ), patch.object(hook, "merge_base") as mock_merge_base:
+            hook.evaluate_changes(state, REPO, hook.HookConfig())
+        mock_merge_base.assert_not_called()
+
+    def test_block_reports_merge_base(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """A failing check resolves the merge-base for the block reason."""
+        state = hook.HookState(changed_files=["README.md"])
+        with patch.object(
+            hook, "get_make_targets", return_value=({"markdownlint"}, None)
+        ), patch.object(
+            hook,
+            "run_make",
+            return_value={"kind": "markdown", "cmd": "make markdownlint", "exit_code": 2},
+        ), patch.object(hook, "merge_base", return_value=("abc123", None)):
+            hook.evaluate_changes(state, REPO, hook.HookConfig())
+        reason = json.loads(capsys.readouterr().out)["reason"]
+        assert "Diff base: origin/main (abc123)" in reason, (
+            f"expected merge-base in block reason but got {reason!r}"
+        )
+
+    def test_target_enumeration_overlaps_git_queries(self) -> None:
+        """make target enumeration runs while changed_files is still working."""
+        enumerating = threading.Event()
+
+        def fake_get_make_targets(_repo: Path) -> tuple[set[str], None]:
+            enumerating.set()
+            return {"markdownlint"}, None
+
+        def fake_changed_files(_repo: Path, _base_ref: str) -> tuple[list[str], None]:
+            assert enumerating.wait(timeout=5), "expected enumeration to start first"
+            return ["README.md"], None
+
+        with patch.object(hook, "repo_root", return_value=(REPO, None)), \
+             patch.object(hook, "ensure_base_ref", return_value=(True, None, False)), \
+             patch.object(hook, "makefile_cache_key", return_value=["Makefile", 1, 1]), \
+             patch.object(hook, "get_make_targets", side_effect=fake_get_make_targets), \
+             patch.object(hook, "changed_files", side_effect=fake_changed_files), \
+             patch.object(
+                 hook, "run_make", return_value={"kind": "markdown", "exit_code": 0}
+             ) as mock_run_make, \
+             patch("shutil.which", return_value="/usr/bin/git"):
+            rc = hook.run_stop_checks(REPO, hook.HookConfig())
+        assert rc == 0, f"expected run_stop_checks rc 0 but got {rc!r}"
+        mock_run_make.assert_called_once_with(REPO, "markdown", ["markdownlint"], 12000, None)
+
+    def test_no_makefile_starts_no_enumeration(self) -> None:
+        """Without a makefile no enumeration thread is started."""
+        with patch.object(hook, "repo_root", return_value=(REPO, None)), \
+             patch.object(hook, "ensure_base_ref", return_value=(True, None, False)), \
+             patch.object(hook, "makefile_cache_key", return_value=None), \
+             patch.object(hook, "start_make_targets") as mock_start, \
+             patch.object(hook, "changed_files", return_value=([], None)), \
+             patch("shutil.which", return_value="/usr/bin/git"):
+            rc = hook.run_stop_checks(REPO, hook.HookConfig())
+        assert rc == 0, f"expected run_stop_checks rc 0 but got {rc!r}"
+        mock_start.assert_not_called()
+
+
+class TestRunMake:
+    """Tests for run_make()."""
+
+    def test_keeps_going_past_failing_targets(self) -> None:
+        """make runs with --keep-going so every target reports in one pass."""
+        with patch.object(
+            hook, "run_bounded", return_value=_completed(2, stdout="lint failed")
+        ) as mock_run:
+            result = hook.run_make(REPO, "code", ["check-fmt", "lint"], 12000)
+        cmd = mock_run.call_args.args[0]
+        assert "--keep-going" in cmd, f"expected --keep-going in make command but got {cmd!r}"
+        assert cmd[-2:] == ["check-fmt", "lint"], (
+            f"expected requested targets at the end of the command but got {cmd!r}"
+        )
+        assert result["exit_code"] == 2, (
+            f"expected make exit code to be reported but got {result['exit_code']!r}"
+        )
+
+    @pytest.mark.slow
+    def test_output_truncated_to_max(self, tmp_path: Path) -> None:
+        """Verbose make output is cut down to the configured size."""
+        (tmp_path / "Makefile").write_text(
+            "lint:\n\t@for i in $$(seq 2000); do echo line $$i; done; exit 1\n",
+            encoding="utf-8",
+        )
+        result = hook.run_make(tmp_path, "code", ["lint"], 200)
+        assert result["exit_code"] == 2, f"expected make failure but got {result!r}"
+        assert len(result["stdout"]) == 200, (
+            f"expected 200 characters of output but got {len(result['stdout'])}"
+        )
+        assert result["stdout"].startswith("line 1\n"), "expected the head of the output"
+        assert result["stdout"].endswith("line 2000\n"), "expected the tail of the output"
+
+    def test_jobs_build_targets_in_parallel(self) -> None:
+        """A job count adds --jobs with per-target output grouping."""
+        with patch.object(hook, "run_bounded", return_value=_completed(0)) as mock_run:
+            hook.run_make(REPO, "code", ["lint", "typecheck"], 12000, jobs=4)
+        cmd = mock_run.call_args.args[0]
+        assert "--jobs=4" in cmd and "--output-sync=target" in cmd, (
+            f"expected parallel jobs with output sync but got {cmd!r}"
+        )
+
+    def test_old_make_retries_without_output_sync(self) -> None:
+        """make without --output-sync support reruns the targets serially."""
+        with patch.object(hook, "run_bounded") as mock_run:
+            mock_run.side_effect = [
+                _completed(2, stderr="make: unrecognized option '--output-sync=target'"),
+                _completed(0),
+            ]
+            result = hook.run_make(REPO, "code", ["lint"], 12000, jobs=4)
+        retry = mock_run.call_args.args[0]
+        assert not any(arg.startswith(("--jobs", "--output-sync")) for arg in retry), (
+            f"expected the retry without job flags but got {retry!r}"
+        )
+        assert result["exit_code"] == 0, f"expected the retry's exit code but got {result!r}"
+
+    def test_parse_make_jobs(self) -> None:
+        """Unset means CPU count, zero disables, integers override."""
+        assert hook.parse_make_jobs("") == (os.cpu_count() or 2), "expected CPU count default"
+        assert hook.parse_make_jobs("0") is None, "expected 0 to omit --jobs"
+        assert hook.parse_make_jobs("3") == 3, "expected an explicit job count"
+
+    def test_missing_cwd(self) -> None:
+        """A vanished repository reports exit 1 rather than raising."""
+        result = hook.run_make(Path("/nonexistent/path"), "code", ["lint"], 12000)
+        assert result["exit_code"] == 1, f"expected exit 1 but got {result!r}"
+        assert "/nonexistent/path" in result["stderr"], (
+            f"expected missing path in stderr but got {result['stderr']!r}"
+        )
+
+
+class TestBoundedCapture:
+    """Tests for BoundedCapture."""
+
+    MARKER = "\n... (output truncated) ...\n"
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 100000])
+    def test_long_output_keeps_head_and_tail(self, chunk_size: int) -> None:
+        """Output beyond the budget keeps equal head and tail around the marker."""
+        data = "".join(f"{i:05d}\n" for i in range(5000)).encode()
+        capture = hook.BoundedCapture(100)
+        for start in range(0, len(data), chunk_size):
+            capture.feed(data[start : start + chunk_size])
+        remaining = 100 - len(self.MARKER)
+        head = remaining // 2
+        tail = remaining - head
+        expected = data[:head].decode() + self.MARKER + data[-tail:].decode()
+        assert capture.text() == expected, f"unexpected capture {capture.text()!r}"
+        assert sum(map(len, capture.tail)) < tail + chunk_size, (
+            "expected the tail buffer to stay bounded"
+        )
+
+    def test_short_output_is_kept_whole(self) -> None:
+        """Output within the budget is returned unchanged."""
+        capture = hook.BoundedCapture(100)
+        capture.feed(b"lint ok\n")
+        assert capture.text() == "lint ok\n", f"unexpected capture {capture.text()!r}"
+
+    def test_tiny_budget_keeps_head_only(self) -> None:
+        """A budget smaller than the marker keeps just the head."""
+        capture = hook.BoundedCapture(5)
+        capture.feed(b"0123456789")
+        assert capture.text() == "01234", f"unexpected capture {capture.text()!r}"
+
+    def test_cuts_never_split_a_utf8_character(self) -> None:
+        """Head and tail cuts drop a split multi-byte character, not mangle it."""
+        # An odd budget and a one-byte prefix put both cuts mid-character.
+        capture = hook.BoundedCapture(101)
+        capture.feed(b"x" + "é".encode() * 200)
+        text = capture.text()
+        assert "\ufffd" not in text, f"expected no replacement characters in {text!r}"
+        head, _marker, tail = text.partition(self.MARKER)
+        assert head == "x" + "é" * 17 and tail == "é" * 18, f"unexpected capture {text!r}"
+
+    def test_zero_budget_keeps_nothing(self) -> None:
+        capture = hook.BoundedCapture(0)
+        capture.feed(b"0123456789")
+        assert capture.text() == "", f"unexpected capture {capture.text()!r}"
+
+
+class TestFetchStamp:
+    """Tests for the POST_TURN_FETCH_TTL fetch stamp."""
+
+    def test_fresh_after_touch(self, tmp_path: Path) -> None:
+        """A just-written stamp is fresh within the TTL."""
+        (tmp_path / ".git").mkdir()
+        hook.touch_fetch_stamp(tmp_path)
+        assert hook.fetch_stamp_fresh(tmp_path, 300), "expected a new stamp to be fresh"
+
+    def test_stale_stamp(self, tmp_path: Path) -> None:
+        """A stamp older than the TTL is not fresh."""
+        (tmp_path / ".git").mkdir()
+        hook.touch_fetch_stamp(tmp_path)
+        stamp = tmp_path / ".git" / hook.FETCH_STAMP_NAME
+        old = stamp.stat().st_mtime - 600
+        os.utime(stamp, (old, old))
+        assert not hook.fetch_stamp_fresh(tmp_path, 300), (
+            "expected a ten-minute-old stamp to be stale"
+        )
+
+    def test_zero_ttl_is_never_fresh(self, tmp_path: Path) -> None:
+        """TTL 0 disables the stamp."""
+        (tmp_path / ".git").mkdir()
+        hook.touch_fetch_stamp(tmp_path)
+        assert not hook.fetch_stamp_fresh(tmp_path, 0), "expected TTL 0 to force a fetch"
+
+    def test_worktree_gitdir_pointer(self, tmp_path: Path) -> None:
+        """A .git file pointing elsewhere hosts the stamp in the linked git dir."""
+        linked = tmp_path / "main.git" / "worktrees" / "wt"
+        linked.mkdir(parents=True)
+        worktree = tmp_path / "wt"
+        worktree.mkdir()
+        (worktree / ".git").write_text(f"gitdir: {linked}\n", encoding="utf-8")
+        hook.touch_fetch_stamp(worktree)
+        assert (linked / hook.FETCH_STAMP_NAME).exists(), (
+            "expected the stamp inside the linked git directory"
+        )
+
+    def test_fresh_stamp_skips_always_fetch(self) -> None:
+        """ALWAYS_FETCH within the TTL falls back to the existing ref."""
+        with patch.object(hook, "fetch_stamp_fresh", return_value=True), \
+             patch.object(hook, "ref_exists", return_value=(True, None)), \
+             patch.object(hook, "fetch_origin_main") as mock_fetch:
+            ok, err, fetched = hook.ensure_origin_main(
+                REPO, always_fetch=True, fetch_ttl=300
+            )
+        assert (ok, err, fetched) == (True, None, False), (
+            f"expected existing ref without fetch but got {(ok, err, fetched)!r}"
+        )
+        mock_fetch.assert_not_called()
+
+    def test_config_default_ttl(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv("POST_TURN_FETCH_TTL", raising=False)
+        ttl = hook.HookConfig.from_env().fetch_ttl
+        assert ttl == hook.DEFAULT_FETCH_TTL, f"expected default TTL but got {ttl!r}"
+
+
+class TestMakeTargetCache:
+    """Tests for the makefile-fingerprint target cache."""
+
+    @staticmethod
+    def _repo(tmp_path: Path) -> Path:
+        (tmp_path / ".git").mkdir()
+        # The include keeps the direct scan out of the way so make -qp runs.
+        (tmp_path / "Makefile").write_text(
+            "-include local.mk\nlint:\n\ttrue\n", encoding="utf-8"
+        )
+        return tmp_path
+
+    def test_second_call_uses_cache(self, tmp_path: Path) -> None:
+        """An unchanged Makefile skips the make -qp run."""
+        repo = self._repo(tmp_path)
+        with patch.object(hook, "run", return_value=_completed(1, stdout="lint:\n")) as mock_run:
+            first, _ = hook.get_make_targets(repo)
+            second, err = hook.get_make_targets(repo)
+        assert first == second == {"lint"}, (
+            f"expected cached targets to match but got {first!r} and {second!r}"
+        )
+        assert err is None, f"expected no error but got {err!r}"
+        assert mock_run.call_count == 1, (
+            f"expected a single make run but got {mock_run.call_count}"
+        )
+
+    def test_changed_makefile_invalidates_cache(self, tmp_path: Path) -> None:
+        """Editing the Makefile forces a fresh enumeration."""
+        repo = self._repo(tmp_path)
+        with patch.object(hook, "run", return_value=_completed(1, stdout="lint:\n")):
+            hook.get_make_targets(repo)
+        (repo / "Makefile").write_text(
+            "-include local.mk\nlint:\n\ttrue\ntypecheck:\n\ttrue\n", encoding="utf-8"
+        )
+        with patch.object(
+            hook, "run", return_value=_completed(1, stdout="lint:\ntypecheck:\n")
+        ) as mock_run:
+            targets, _ = hook.get_make_targets(repo)
+        mock_run.assert_called_once()
+        assert targets == {"lint", "typecheck"}, f"expected fresh targets but got {targets!r}"
+
+    def test_changed_include_invalidates_cache(self, tmp_path: Path) -> None:
+        """Included makefiles from MAKEFILE_LIST are part of the fingerprint."""
+        repo = self._repo(tmp_path)
+        (repo / "common.mk").write_text("X = 1\n", encoding="utf-8")
+        database = "MAKEFILE_LIST := Makefile common.mk\nlint:\n"
+        with patch.object(hook, "run", return_value=_completed(1, stdout=database)) as mock_run:
+            hook.get_make_targets(repo)
+            hook.get_make_targets(repo)
+            assert mock_run.call_count == 1, "expected unchanged includes to hit the cache"
+            (repo / "common.mk").write_text("X = 22\n", encoding="utf-8")
+            hook.get_make_targets(repo)
+        assert mock_run.call_count == 2, (
+            f"expected an edited include to force a make run but got {mock_run.call_count}"
+        )
+
+    def test_created_optional_include_invalidates_cache(self, tmp_path: Path) -> None:
+        """A missing -include file appearing later forces a fresh enumeration."""
+        repo = self._repo(tmp_path)
+        with patch.object(
+            hook, "run", return_value=_completed(1, stdout="MAKEFILE_LIST := Makefile\nlint:\n")
+        ) as mock_run:
+            hook.get_make_targets(repo)
+            (repo / "local.mk").write_text("fmt:\n", encoding="utf-8")
+            hook.get_make_targets(repo)
+        assert mock_run.call_count == 2, (
+            f"expected the new include to force a make run but got {mock_run.call_count}"
+        )
+
+
+class TestScanMakefileTargets:
+    """Tests for reading targets straight from simple makefiles."""
+
+    def test_plain_makefile_skips_make(self, tmp_path: Path) -> None:
+        """A self-contained Makefile is read without spawning make."""
+        (tmp_path / "Makefile").write_text(
+            "TOOLS := a \\\nb: c\n.PHONY: lint\nlint: typecheck\n\ttrue\ntypecheck:\n",
+            encoding="utf-8",
+        )
+        with patch.object(hook, "run") as mock_run:
+            targets, err = hook.get_make_targets(tmp_path)
+        mock_run.assert_not_called()
+        assert targets == {".PHONY", "lint", "typecheck"}, (
+            f"expected rule targets from the scan but got {targets!r}"
+        )
+        assert err is None, f"expected no error but got {err!r}"
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "include common.mk\nlint:\n",
+            "ifdef CI\nlint:\nendif\n",
+            "$(BIN): main.o\nlint:\n",
+            "$(eval $(call rule,lint))\nfmt:\n",
+        ],
+    )
+    def test_dynamic_makefile_falls_back(self, text: str, tmp_path: Path) -> None:
+        """Includes, conditionals, and computed targets defer to make -qp."""
+        makefile = tmp_path / "Makefile"
+        makefile.write_text(text, encoding="utf-8")
+        scanned = hook.scan_makefile_targets(makefile)
+        assert scanned is None, f"expected the scan to defer to make but got {scanned!r}"
+
+
+class TestTurnMadeEdits:
+    """Tests for reading the turn's tool uses from the transcript."""
+
+    @staticmethod
+    def _transcript(tmp_path: Path, *entries: dict[str, object]) -> dict[str, object]:
+        path = tmp_path / "session.jsonl"
+        path.write_text("".join(json.dumps(e) + "\n" for e in entries), encoding="utf-8")
+        return {"transcript_path": str(path)}
+
+    @staticmethod
+    def _tool_use(name: str) -> dict[str, object]:
+        return {
+            "type": "assistant",
+            "message": {"content": [{"type": "tool_use", "name": name, "input": {}}]},
+        }
+
+    @staticmethod
+    def _tool_result() -> dict[str, object]:
+        return {"type": "user", "message": {"content": [{"type": "tool_result"}]}}
+
+    def test_read_only_turn(self, tmp_path: Path) -> None:
+        """Only read-only tools since the last prompt means no edits."""
+        hook_input = self._transcript(
+            tmp_path,
+            self._tool_use("Edit"),
+            {"type": "user", "message": {"content": "what does this do?"}},
+            self._tool_use("Read"),
+            self._tool_result(),
+            {"type": "user", "isMeta": True, "message": {"content": "<reminder>"}},
+            self._tool_use("Grep"),
+        )
+        assert hook.turn_made_edits(hook_input) is False, (
+            "expected the earlier turn's Edit to be ignored"
+        )
+
+    def test_mutating_tool_counts_as_edit(self, tmp_path: Path) -> None:
+        """Tools outside the read-only set mark the turn as editing."""
+        hook_input = self._transcript(
+            tmp_path,
+            {"type": "user", "message": {"content": [{"type": "text", "text": "fix it"}]}},
+            self._tool_use("Bash"),
+            self._tool_result(),
+            self._tool_use("Read"),
+        )
+        assert hook.turn_made_edits(hook_input) is True, "expected Bash to count as an edit"
+
+    def test_unknown_without_turn_start(self, tmp_path: Path) -> None:
+        """A transcript without a visible prompt gives no answer."""
+        assert hook.turn_made_edits(self._transcript(tmp_path, self._tool_use("Read"))) is None
+        assert hook.turn_made_edits({}) is None, "expected None without a transcript"
+
+    def test_main_skips_read_only_turn(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The opt-in skip exits before any git work, except after a block."""
+        monkeypatch.setenv("POST_TURN_SKIP_IF_NO_EDITS", "1")
+        hook_input = self._transcript(
+            tmp_path, {"type": "user", "message": {"content": "hi"}}, self._tool_use("Read")
+        )
+        with patch.object(hook, "parse_hook_input", return_value=hook_input), \
+             patch.object(hook, "run_stop_checks", return_value=0) as mock_checks:
+            assert hook.main() == 0, "expected a clean exit"
+            mock_checks.assert_not_called()
+            hook_input["stop_hook_active"] = True
+            hook.main()
+        mock_checks.assert_called_once()
+
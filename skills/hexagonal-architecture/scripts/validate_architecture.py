@@ -9,13 +9,27 @@ Expects standard layout:
   src/domain/     - Domain layer (no infrastructure imports)
   src/application/ - Application layer (no adapter imports)
   src/adapters/   - Adapter layer
+
+By default nothing is written to disk. With --cache, imports found in each
+file are cached in .validate_arch_cache/ by content hash, so unchanged
+files are not re-parsed, and files whose mtime and size are unchanged are
+not even read. An edit that keeps a file's size and mtime (as `cp -p` or
+`rsync -a` can) is then missed; run without --cache to check every file
+afresh.
+Large numbers of uncached files are parsed in parallel (see --jobs).
 """
 
+import argparse
 import ast
+import hashlib
+import json
+import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Iterator
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
 
 # Infrastructure modules that should never appear in domain
 INFRASTRUCTURE_MODULES = frozenset({
@@ -36,8 +50,43 @@ ADAPTER_IMPORT_PATTERNS = frozenset({
     "adapters",
 })
 
+# Any import of a checked module names it in the source, so a file without a
+# match cannot violate a rule and need not be parsed.
+CHECKED_MODULES_RE = re.compile(
+    rb"\b(?:"
+    + b"|".join(re.escape(m.encode()) for m in sorted(INFRASTRUCTURE_MODULES | ADAPTER_IMPORT_PATTERNS))
+    + rb")\b"
+)
 
-@dataclass
+# (forbidden modules, message) pairs checked for each layer's files.
+LAYER_RULES: dict[str, tuple[tuple[frozenset[str], str], ...]] = {
+    "domain": (
+        (INFRASTRUCTURE_MODULES, "Domain imports infrastructure module '{module}'"),
+        (ADAPTER_IMPORT_PATTERNS, "Domain imports from adapters"),
+    ),
+    "application": (
+        (ADAPTER_IMPORT_PATTERNS, "Application layer imports from adapters"),
+    ),
+    "domain-tests": (
+        (
+            INFRASTRUCTURE_MODULES,
+            "Domain test imports infrastructure '{module}' (tests should use fakes)",
+        ),
+    ),
+}
+
+CACHE_DIR = Path(".validate_arch_cache")
+# Bump when the cached data or the way imports are extracted changes.
+CACHE_VERSION = 3
+# Fields holding the statements nested in a statement, except handler, or
+# match case, in source order.
+STATEMENT_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
+# Below this many files to parse, starting worker processes costs more
+# than it saves.
+PARALLEL_MIN_FILES = 64
+
+
+@dataclass(frozen=True, slots=True)
 class Violation:
     file: Path
     line: int
@@ -46,128 +95,470 @@ class Violation:
     message: str
 
 
-def extract_imports(
-    source: str,
-    source_name: str = "<unknown>",
-) -> Iterator[tuple[int, str]]:
-    """Yield (line_number, module_name) for all imports in source.
+@dataclass
+class ImportCache:
+    """Imports per source file, keyed by the SHA-256 of its bytes.
+
+    A second index maps each checked path to its mtime, size and digest at
+    the last run, so unchanged files need only a ``stat``. That trusts the
+    stat: a same-size edit whose mtime was preserved (``cp -p``,
+    ``rsync -a``) keeps the old imports until a run without ``--cache``.
+
+    Attributes:
+        path: JSON file the cache is loaded from and saved to.
+        entries: Imports recorded for each source digest; empty for sources
+            that mention no checked module.
+        seen: Digests looked up this run; only these are saved, so entries
+            for deleted or edited files do not accumulate.
+        dirty: Whether anything was added since loading.
+        digests: Digest of each file hashed by ``prefetch``.
+        unparsable: Digests of sources that failed to parse this run, so
+            their warning is printed once.
+        stats: ``(mtime_ns, size, digest)`` per path, as loaded.
+        fresh_stats: ``(mtime_ns, size, digest)`` per path seen this run.
+    """
+
+    path: Path
+    entries: dict[str, list[tuple[int, str]]] = field(default_factory=dict)
+    seen: set[str] = field(default_factory=set)
+    dirty: bool = False
+    digests: dict[Path, str] = field(default_factory=dict)
+    unparsable: set[str] = field(default_factory=set)
+    stats: dict[str, tuple[int, int, str]] = field(default_factory=dict)
+    fresh_stats: dict[str, tuple[int, int, str]] = field(default_factory=dict)
+
+    @staticmethod
+    def key() -> list[int]:
+        """Return the cache format version and the parsing Python version."""
+        return [CACHE_VERSION, *sys.version_info[:2]]
+
+    @classmethod
+    def load(cls, directory: Path = CACHE_DIR) -> "ImportCache":
+        """Load the cache from ``directory``, or start empty.
+
+        Args:
+            directory: Cache directory, relative to the project root.
+        """
+        path = directory / "imports.json"
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("key") != cls.key():
+            return cls(path)
+        entries = {
+            digest: [(line, module) for line, module in imports]
+            for digest, imports in data.get("entries", {}).items()
+        }
+        stats = {
+            name: (mtime_ns, size, digest)
+            for name, (mtime_ns, size, digest) in data.get("files", {}).items()
+        }
+        return cls(path, entries, stats=stats)
+
+    def digest(self, py_file: Path) -> tuple[str, bytes | None]:
+        """Return a file's digest, reading it only if its stat has changed.
+
+        Args:
+            py_file: Python source file.
+
+        Returns:
+            The SHA-256 of the file and its bytes, or None for the bytes
+            when the digest came from the stat index.
+        """
+        st = py_file.stat()
+        name = str(py_file)
+        known = self.stats.get(name)
+        if (
+            known is not None
+            and known[:2] == (st.st_mtime_ns, st.st_size)
+            and known[2] in self.entries
+        ):
+            digest, source = known[2], None
+        else:
+            source = py_file.read_bytes()
+            digest = hashlib.sha256(source).hexdigest()
+        self.fresh_stats[name] = (st.st_mtime_ns, st.st_size, digest)
+        return digest, source
+
+    def add(self, digest: str, found: list[tuple[int, str]] | None) -> None:
+        """Record the imports parsed for a digest, or that it failed to parse.
+
+        Args:
+            digest: SHA-256 of the source.
+            found: Imports in the source, or None after a SyntaxError.
+        """
+        if found is None:
+            # Not cached, so the warning repeats on later runs until fixed.
+            self.unparsable.add(digest)
+            return
+        self.entries[digest] = found
+        self.seen.add(digest)
+        self.dirty = True
+
+    def prefetch(self, files: list[Path], jobs: int) -> None:
+        """Hash every file and parse the uncached ones that need it.
+
+        Each file is read at most once. Uncached sources that never mention
+        a checked module are recorded with no imports straight away; the
+        rest are parsed in worker processes when there are at least
+        ``PARALLEL_MIN_FILES`` of them, and in this process otherwise.
+
+        Args:
+            files: Python source files about to be checked.
+            jobs: Maximum number of worker processes.
+        """
+        # Digest -> (source, name) for each distinct source still to parse.
+        pending: dict[str, tuple[bytes, str]] = {}
+        for py_file in files:
+            digest, source = self.digest(py_file)
+            self.digests[py_file] = digest
+            if source is None or digest in self.entries or digest in pending:
+                continue
+            if CHECKED_MODULES_RE.search(source) is None:
+                self.add(digest, [])
+            else:
+                pending[digest] = (source, str(py_file))
+        sources = [source for source, _name in pending.values()]
+        names = [name for _source, name in pending.values()]
+        if jobs > 1 and len(pending) >= PARALLEL_MIN_FILES:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                found = list(pool.map(parse_imports, sources, names, chunksize=16))
+        else:
+            found = [parse_imports(source, name) for source, name in zip(sources, names)]
+        for digest, imports in zip(pending, found):
+            self.add(digest, imports)
+
+    def imports(self, py_file: Path) -> list[tuple[int, str]]:
+        """Return (line_number, module_name) for all imports in a file.
+
+        Args:
+            py_file: Python source file to read.
+        """
+        source = None
+        digest = self.digests.get(py_file)
+        if digest is None:
+            digest, source = self.digest(py_file)
+        if digest in self.unparsable:
+            return []
+        cached = self.entries.get(digest)
+        if cached is None:
+            if source is None:
+                source = py_file.read_bytes()
+            digest, cached = scan_source(source, str(py_file))
+            self.add(digest, cached)
+            if cached is None:
+                return []
+        self.seen.add(digest)
+        return cached
+
+    def save(self, *, prune: bool = True) -> None:
+        """Write the entries back to disk, if anything changed.
+
+        Failures are ignored: the cache only ever saves time.
+
+        Args:
+            prune: Keep only the entries seen this run. Pass False after a
+                run that stopped early, so unvisited files stay cached.
+        """
+        keep = self.seen if prune else self.entries.keys()
+        files = self.fresh_stats if prune else self.stats | self.fresh_stats
+        if not self.dirty and keep == self.entries.keys() and files == self.stats:
+            return
+        data = {
+            "key": self.key(),
+            "entries": {digest: self.entries[digest] for digest in sorted(keep)},
+            "files": {
+                name: stat
+                for name, stat in sorted(files.items())
+                if stat[2] in keep
+            },
+        }
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(exist_ok=True)
+            ignore = self.path.parent / ".gitignore"
+            if not ignore.exists():
+                ignore.write_text("*\n", encoding="utf-8")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+
+def parse_source(source: str | bytes, source_name: str = "<unknown>") -> ast.Module | None:
+    """Parse source, warning on stderr and returning None on a SyntaxError.
 
     Args:
-        source: Python source text to parse.
+        source: Python source text or bytes; bytes honour a coding cookie.
         source_name: Human-readable label for diagnostic messages
             (typically a file path).
     """
     try:
-        tree = ast.parse(source, filename=source_name)
+        return ast.parse(source, filename=source_name)
     except SyntaxError as e:
         print(
             f"Warning: skipped {source_name!r} due to SyntaxError: {e}",
             file=sys.stderr,
         )
-        return
-    
-    for node in ast.walk(tree):
+        return None
+
+
+def tree_imports(tree: ast.Module) -> Iterator[tuple[int, str]]:
+    """Yield (line_number, module_name) for all imports in a parsed module.
+
+    Args:
+        tree: Module returned by ``parse_source``.
+    """
+    # Imports are statements, so only statement lists are followed (into
+    # function and class bodies too); ast.walk would visit every expression.
+    stack: list[ast.AST] = list(reversed(tree.body))
+    while stack:
+        node = stack.pop()
         if isinstance(node, ast.Import):
             for alias in node.names:
-                yield node.lineno, alias.name.split(".")[0]
+                yield node.lineno, alias.name.partition(".")[0]
         elif isinstance(node, ast.ImportFrom):
             if node.module:
-                yield node.lineno, node.module.split(".")[0]
+                yield node.lineno, node.module.partition(".")[0]
+        else:
+            nested = [
+                child
+                for name in STATEMENT_FIELDS
+                if isinstance(children := getattr(node, name, None), list)
+                for child in children
+            ]
+            stack.extend(reversed(nested))
 
 
-def check_domain_layer(domain_path: Path) -> Iterator[Violation]:
-    """Check domain layer for infrastructure imports."""
-    for py_file in domain_path.rglob("*.py"):
-        source = py_file.read_text(encoding="utf-8")
-        for line, module in extract_imports(source, source_name=str(py_file)):
-            if module in INFRASTRUCTURE_MODULES:
-                yield Violation(
-                    file=py_file,
-                    line=line,
-                    module=module,
-                    layer="domain",
-                    message=f"Domain imports infrastructure module '{module}'",
-                )
-            if module in ADAPTER_IMPORT_PATTERNS:
+def extract_imports(
+    source: str | bytes,
+    source_name: str = "<unknown>",
+) -> Iterator[tuple[int, str]]:
+    """Yield (line_number, module_name) for all imports in source.
+
+    Args:
+        source: Python source text or bytes to parse.
+        source_name: Human-readable label for diagnostic messages
+            (typically a file path).
+    """
+    tree = parse_source(source, source_name)
+    if tree is None:
+        return
+    yield from tree_imports(tree)
+
+
+def parse_imports(source: bytes, source_name: str) -> list[tuple[int, str]] | None:
+    """Parse one source and list its imports; the unit of work for workers.
+
+    Args:
+        source: Python source bytes.
+        source_name: Human-readable label for diagnostic messages.
+
+    Returns:
+        The imports in ``source``, or None when it does not parse.
+    """
+    tree = parse_source(source, source_name=source_name)
+    if tree is None:
+        return None
+    return list(tree_imports(tree))
+
+
+def scan_source(
+    source: bytes, source_name: str
+) -> tuple[str, list[tuple[int, str]] | None]:
+    """Hash and parse one source.
+
+    Sources that never mention a checked module are not parsed: they are
+    recorded with no imports, and a syntax error in one goes unreported.
+
+    Args:
+        source: Python source bytes.
+        source_name: Human-readable label for diagnostic messages.
+
+    Returns:
+        The SHA-256 of ``source`` and its imports, or None for the imports
+        when it does not parse.
+    """
+    digest = hashlib.sha256(source).hexdigest()
+    if CHECKED_MODULES_RE.search(source) is None:
+        return digest, []
+    return digest, parse_imports(source, source_name)
+
+
+def iter_python_files(root: Path) -> Iterator[Path]:
+    """Yield the ``.py`` files under ``root``, like ``root.rglob("*.py")``.
+
+    Directory entries come straight from ``os.scandir``, whose cached type
+    information spares a ``stat`` per entry. Symlinked directories are not
+    followed, and unreadable directories are skipped, as with ``rglob``.
+
+    Args:
+        root: Directory to search.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".py") and entry.is_file():
+                        yield Path(entry.path)
+        except OSError:
+            continue
+
+
+def file_imports(
+    py_file: Path, cache: ImportCache | None = None
+) -> Iterable[tuple[int, str]]:
+    """Return the imports in a file, through the cache when one is given.
+
+    Args:
+        py_file: Python source file to read.
+        cache: Import cache, or None to always parse.
+    """
+    if cache is not None:
+        return cache.imports(py_file)
+    return extract_imports(py_file.read_bytes(), source_name=str(py_file))
+
+
+def check_file(
+    py_file: Path, layer: str, cache: ImportCache | None = None
+) -> Iterator[Violation]:
+    """Check one file's imports against the rules for its layer.
+
+    Args:
+        py_file: Python source file to check.
+        layer: Key into ``LAYER_RULES``.
+        cache: Import cache, or None to always parse.
+    """
+    rules = LAYER_RULES[layer]
+    for line, module in file_imports(py_file, cache):
+        for forbidden, message in rules:
+            if module in forbidden:
                 yield Violation(
                     file=py_file,
                     line=line,
                     module=module,
-                    layer="domain",
-                    message=f"Domain imports from adapters",
+                    layer=layer,
+                    message=message.format(module=module),
                 )
 
 
-def check_application_layer(app_path: Path) -> Iterator[Violation]:
+def layer_files(src_path: Path, tests_path: Path) -> Iterator[tuple[str, Path]]:
+    """Yield (layer, file) for every file under a checked layer directory.
+
+    Args:
+        src_path: Project source directory.
+        tests_path: Project tests directory.
+    """
+    for layer, root in (
+        ("domain", src_path / "domain"),
+        ("application", src_path / "application"),
+        ("domain-tests", tests_path / "domain"),
+    ):
+        for py_file in iter_python_files(root):
+            yield layer, py_file
+
+
+def check_domain_layer(
+    domain_path: Path, cache: ImportCache | None = None
+) -> Iterator[Violation]:
+    """Check domain layer for infrastructure imports."""
+    for py_file in iter_python_files(domain_path):
+        yield from check_file(py_file, "domain", cache)
+
+
+def check_application_layer(
+    app_path: Path, cache: ImportCache | None = None
+) -> Iterator[Violation]:
     """Check application layer for adapter imports."""
-    for py_file in app_path.rglob("*.py"):
-        source = py_file.read_text(encoding="utf-8")
-        for line, module in extract_imports(source, source_name=str(py_file)):
-            if module in ADAPTER_IMPORT_PATTERNS:
-                yield Violation(
-                    file=py_file,
-                    line=line,
-                    module=module,
-                    layer="application",
-                    message=f"Application layer imports from adapters",
-                )
+    for py_file in iter_python_files(app_path):
+        yield from check_file(py_file, "application", cache)
 
 
-def check_domain_tests(tests_path: Path) -> Iterator[Violation]:
+def check_domain_tests(
+    tests_path: Path, cache: ImportCache | None = None
+) -> Iterator[Violation]:
     """Check domain tests don't use infrastructure."""
-    domain_tests = tests_path / "domain"
-    if not domain_tests.exists():
-        return
-    
-    for py_file in domain_tests.rglob("*.py"):
-        source = py_file.read_text(encoding="utf-8")
-        for line, module in extract_imports(source, source_name=str(py_file)):
-            if module in INFRASTRUCTURE_MODULES:
-                yield Violation(
-                    file=py_file,
-                    line=line,
-                    module=module,
-                    layer="domain-tests",
-                    message=f"Domain test imports infrastructure '{module}' (tests should use fakes)",
-                )
+    for py_file in iter_python_files(tests_path / "domain"):
+        yield from check_file(py_file, "domain-tests", cache)
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
     """Validate hexagonal architecture boundaries from the CLI.
 
+    Parameters
+    ----------
+    argv
+        Command-line arguments; defaults to ``sys.argv[1:]``.
+
     Returns
     -------
     int
         0 when no violations are found, 1 when at least one violation is
         detected or the ``src/`` directory is missing.
     """
+    parser = argparse.ArgumentParser(description="Validate hexagonal architecture boundaries.")
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help=f"reuse and update imports cached in {CACHE_DIR}/ (default: off)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes for parsing uncached files (default: CPU count; 1 disables)",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop at the first violation instead of reporting them all",
+    )
+    args = parser.parse_args(argv)
+
     src_path = Path("src")
     tests_path = Path("tests")
-    
+
     if not src_path.exists():
         print("Error: src/ directory not found. Run from project root.")
         return 1
-    
+
+    # Without --cache the in-memory cache still serves prefetch, but is never
+    # loaded from or saved to disk.
+    cache = ImportCache.load() if args.cache else ImportCache(CACHE_DIR / "imports.json")
+    files = list(layer_files(src_path, tests_path))
     violations: list[Violation] = []
-    
-    domain_path = src_path / "domain"
-    if domain_path.exists():
-        violations.extend(check_domain_layer(domain_path))
-    
-    app_path = src_path / "application"
-    if app_path.exists():
-        violations.extend(check_application_layer(app_path))
-    
-    if tests_path.exists():
-        violations.extend(check_domain_tests(tests_path))
-    
+    if args.fail_fast:
+        # Files are parsed lazily, so nothing past the first hit is read.
+        first = next(
+            (v for layer, py_file in files for v in check_file(py_file, layer, cache)),
+            None,
+        )
+        violations = [] if first is None else [first]
+    else:
+        cache.prefetch([py_file for _layer, py_file in files], args.jobs)
+        for layer, py_file in files:
+            violations.extend(check_file(py_file, layer, cache))
+
+    if args.cache:
+        cache.save(prune=not args.fail_fast)
+
     if violations:
-        print(f"Found {len(violations)} architecture violation(s):\n")
-        for v in violations:
-            print(f"  {v.file}:{v.line}")
-            print(f"    [{v.layer}] {v.message}\n")
+        # One write for the whole report rather than two prints per violation.
+        header = (
+            "Stopped at the first architecture violation (--fail-fast):"
+            if args.fail_fast
+            else f"Found {len(violations)} architecture violation(s):"
+        )
+        report = [f"{header}\n\n"]
+        report.extend(f"  {v.file}:{v.line}\n    [{v.layer}] {v.message}\n\n" for v in violations)
+        sys.stdout.write("".join(report))
         return 1
-    
+
     print("✓ No architecture violations found")
     return 0
 
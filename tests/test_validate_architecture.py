@@ -0,0 +1,180 @@
+"""Tests for the hexagonal architecture validator and its import cache."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import sys
+from pathlib import Path
+from types import ModuleType
+from unittest.mock import patch
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT_PATH = (
+    REPO_ROOT / "skills" / "hexagonal-architecture" / "scripts" / "validate_architecture.py"
+)
+
+
+def _load_validator() -> ModuleType:
+    """Load the validator script as a module."""
+    spec = importlib.util.spec_from_file_location("validate_architecture", SCRIPT_PATH)
+    assert spec is not None, "could not create a module specification"
+    assert spec.loader is not None, "module specification has no loader"
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+validator = _load_validator()
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Create a project with one clean and one violating domain module."""
+    domain = tmp_path / "src" / "domain"
+    domain.mkdir(parents=True)
+    (domain / "model.py").write_text("import dataclasses\n", encoding="utf-8")
+    (domain / "repo.py").write_text("import os\nimport sqlalchemy\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def run_validator(capsys: pytest.CaptureFixture[str], *args: str) -> tuple[int, str]:
+    """Run the validator in-process with its cache and return exit code and stdout."""
+    code = validator.main(["--jobs", "1", "--cache", *args])
+    return code, capsys.readouterr().out
+
+
+def test_default_run_writes_nothing(
+    project: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Without --cache a check leaves no files behind."""
+    code = validator.main(["--jobs", "1"])
+    out = capsys.readouterr().out
+
+    assert code == 1, f"expected violations, got {code}, stdout: {out}"
+    assert not (project / validator.CACHE_DIR).exists(), "expected no cache directory"
+
+
+def test_unchanged_content_is_a_cache_hit(
+    project: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """A file whose bytes are unchanged is not parsed again."""
+    first = run_validator(capsys)
+    # A new mtime defeats the stat index, so only the content hash can hit.
+    os.utime(project / "src" / "domain" / "repo.py", ns=(0, 0))
+
+    with patch.object(validator, "parse_source", side_effect=AssertionError("parsed")):
+        second = run_validator(capsys)
+
+    assert second == first, f"expected cached output {first!r}, got {second!r}"
+
+
+def test_edit_invalidates_cached_imports(
+    project: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Editing a file makes the next run see its new imports."""
+    run_validator(capsys)
+    (project / "src" / "domain" / "model.py").write_text("import requests\n", encoding="utf-8")
+
+    code, out = run_validator(capsys)
+
+    assert code == 1, f"expected violations, got {code}, stdout: {out}"
+    assert "src/domain/model.py:1" in out, f"expected the edited file reported, got: {out}"
+    assert "Found 2 architecture violation(s)" in out, f"expected two violations, got: {out}"
+
+
+def test_corrupt_cache_file_is_rebuilt(
+    project: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """An unreadable cache file is ignored and replaced."""
+    expected = run_validator(capsys)
+    cache_file = project / validator.CACHE_DIR / "imports.json"
+    cache_file.write_text("{not json", encoding="utf-8")
+
+    result = run_validator(capsys)
+
+    assert result == expected, f"expected {expected!r} despite the corrupt cache, got {result!r}"
+    data = json.loads(cache_file.read_text(encoding="utf-8"))
+    assert data["key"] == validator.ImportCache.key(), f"expected a rebuilt cache, got {data!r}"
+
+
+def test_no_cache_matches_cached_output(
+    project: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """An uncached run reports exactly what a cached run reports."""
+    run_validator(capsys)
+    cached = run_validator(capsys)
+
+    uncached = run_validator(capsys, "--no-cache")
+
+    assert uncached == cached, f"expected {cached!r} without the cache, got {uncached!r}"
+
+
+def test_latin1_source_is_checked(
+    project: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """A source declaring a non-UTF-8 encoding is parsed, not a crash."""
+    (project / "src" / "domain" / "legacy.py").write_bytes(
+        b"# -*- coding: latin-1 -*-\n# caf\xe9\nimport boto3\n"
+    )
+
+    for args in ((), ("--no-cache",)):
+        code, out = run_validator(capsys, *args)
+        assert code == 1, f"expected violations with {args!r}, got {code}, stdout: {out}"
+        assert "src/domain/legacy.py:3" in out, (
+            f"expected the latin-1 file reported with {args!r}, got: {out}"
+        )
+
+
+def test_unchanged_stat_skips_reading(
+    project: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """A file whose mtime and size match the stat index is not read."""
+    run_validator(capsys)
+    cache = validator.ImportCache.load()
+
+    digest, source = cache.digest(Path("src/domain/repo.py"))
+
+    assert source is None, f"expected a stat-index hit without reading, got {source!r}"
+    assert digest in cache.entries, f"expected the indexed digest {digest!r} to be cached"
+
+
+def test_size_change_forces_rehash(
+    project: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """A new size is rehashed even when the mtime is preserved."""
+    run_validator(capsys)
+    repo_file = project / "src" / "domain" / "repo.py"
+    st = repo_file.stat()
+    repo_file.write_text("import os\nimport sqlalchemy\nimport redis\n", encoding="utf-8")
+    os.utime(repo_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+    cache = validator.ImportCache.load()
+
+    digest, source = cache.digest(Path("src/domain/repo.py"))
+
+    assert source == repo_file.read_bytes(), f"expected the file reread, got {source!r}"
+    assert digest not in cache.entries, f"expected a new digest, got cached {digest!r}"
+    code, out = run_validator(capsys)
+    assert code == 1, f"expected violations, got {code}, stdout: {out}"
+    assert "src/domain/repo.py:3" in out, f"expected the new import reported, got: {out}"
+
+
+def test_fail_fast_stops_at_first_violation(
+    project: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """--fail-fast exits non-zero after reporting a single violation."""
+    (project / "src" / "domain" / "model.py").write_text(
+        "import requests\nimport redis\n", encoding="utf-8"
+    )
+
+    code, out = run_validator(capsys, "--fail-fast")
+
+    assert code == 1, f"expected a non-zero exit, got {code}, stdout: {out}"
+    assert "(--fail-fast)" in out, f"expected the fail-fast header, got: {out}"
+    assert out.count("[domain]") == 1, f"expected exactly one violation, got: {out}"